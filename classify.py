@@ -0,0 +1,148 @@
+import re
+import time
+from collections import Counter
+
+from textanalysis import tokenize
+
+# Listing key a category's keyword hits are kept under until they are counted; never written to CSV
+HITS_KEY = '_hits'
+
+
+def _is_acronym(keyword):
+    """Short all-caps keywords like 'IT' and 'AI' are matched as exact, case-sensitive words"""
+    return len(keyword) <= 3 and keyword.isupper()
+
+
+class KeywordMatcher:
+    """The category keyword table compiled into a single-pass, word-boundary token matcher
+
+    Text is split into words once. A keyword has to start at the beginning of
+    a word, so 'tech' still finds "Technology" but 'AI' no longer fires inside
+    "details". Short all-caps acronyms must match a whole word with the same
+    case. Multi-word keywords match consecutive words. When a text matches
+    several categories, the first one in table order wins.
+    """
+
+    # Stop memoizing new words once this many have been seen
+    MAX_CACHED_WORDS = 200_000
+
+    def __init__(self, categories):
+        self.categories = {name: list(keywords) for name, keywords in categories.items()}
+        self.names = list(self.categories)
+
+        # word prefix -> category indexes, for single-word keywords
+        self.prefixes = {}
+        # first word -> [(following words, category index)] for multi-word keywords
+        self.phrases = {}
+        acronyms = {}
+        for i, keywords in enumerate(self.categories.values()):
+            for keyword in keywords:
+                if _is_acronym(keyword):
+                    acronyms[keyword] = i
+                    continue
+                words = keyword.lower().split()
+                if len(words) == 1:
+                    self.prefixes.setdefault(words[0], set()).add(i)
+                else:
+                    self.phrases.setdefault(words[0], []).append((tuple(words[1:]), i))
+
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        # Words that don't start with one of these can't hit any keyword
+        shortest = self.prefix_lengths[0] if self.prefix_lengths else 0
+        self.stems = {prefix[:shortest] for prefix in self.prefixes}
+        self.acronyms = acronyms
+        self.acronym_pattern = (re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(acronyms))) + r')\b')
+                                if acronyms else None)
+        # word -> category indexes it hits, filled in as words are seen
+        self.word_hits = {}
+
+    def _hits_for_word(self, word):
+        """Category indexes whose single-word keywords start this word"""
+        if not self.stems or word[:self.prefix_lengths[0]] not in self.stems:
+            return ()
+        found = set()
+        for length in self.prefix_lengths:
+            if length > len(word):
+                break
+            found |= self.prefixes.get(word[:length], set())
+        return tuple(sorted(found))
+
+    def hit_counts(self, text, words=None):
+        """Count keyword hits per category index in one pass over the text's words
+
+        Pass `words` when the text has already been tokenized; `text` is then
+        only used for the case-sensitive acronym check.
+        """
+        counts = [0] * len(self.names)
+        if words is None:
+            words = tokenize(text)
+        word_hits = self.word_hits
+
+        # Most words hit nothing, so look them all up at C speed and only
+        # loop in Python over the ones that matched
+        found = list(map(word_hits.get, words))
+        if None in found:
+            for pos, hits in enumerate(found):
+                if hits is None:
+                    word = words[pos]
+                    found[pos] = hits = self._hits_for_word(word)
+                    if len(word_hits) < self.MAX_CACHED_WORDS:
+                        word_hits[word] = hits
+        for hits in filter(None, found):
+            for i in hits:
+                counts[i] += 1
+
+        if self.phrases and not self.phrases.keys().isdisjoint(words):
+            for pos, word in enumerate(words):
+                for rest, i in self.phrases.get(word, ()):
+                    following = words[pos + 1:pos + 1 + len(rest)]
+                    if len(following) == len(rest) and all(w.startswith(r) for w, r in zip(following, rest)):
+                        counts[i] += 1
+
+        if self.acronym_pattern and any(map(text.__contains__, self.acronyms)):
+            for match in self.acronym_pattern.finditer(text):
+                counts[self.acronyms[match.group()]] += 1
+
+        return counts
+
+    def hits(self, text, words=None):
+        """Count keyword hits per category name"""
+        return Counter({self.names[i]: n for i, n in enumerate(self.hit_counts(text, words)) if n})
+
+    def classify(self, text, default='Other', words=None):
+        """Return (category, per-category hit counts) for a text"""
+        counts = self.hit_counts(text, words)
+        hits = {self.names[i]: n for i, n in enumerate(counts) if n}
+        for i, n in enumerate(counts):
+            if n:
+                return self.names[i], hits
+        return default, hits
+
+
+def benchmark(categories, count=1_000_000):
+    """Time classifying `count` synthetic listings"""
+    titles = ["IT Intern - Summer 2025", "Summer 2025 Intern - Creative & Design", "Research Assistant Internship",
+              "Marketing and Sales Intern", "Hospital Volunteer Program", "High School Summer Internship"]
+    descriptions = ["See link for details", "Work with our data science team on machine learning projects.",
+                    "Help patients and nurses in the clinical wing.", "No description available"]
+    texts = [f"{titles[i % len(titles)]} #{i} {descriptions[i % len(descriptions)]}" for i in range(count)]
+
+    matcher = KeywordMatcher(categories)
+    totals = Counter()
+    start = time.perf_counter()
+    for text in texts:
+        category, _ = matcher.classify(text)
+        totals[category] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"\n=== Classified {count:,} listings in {elapsed:.2f} s ({count / elapsed:,.0f}/s) ===")
+    for category, n in totals.most_common():
+        print(f"{category}: {n:,}")
+    print("=" * 30)
+    return elapsed
+
+
+if __name__ == "__main__":
+    from webScraper import InternshipScraper
+
+    benchmark(InternshipScraper().categories)
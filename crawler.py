@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncCrawlEngine:
+    """Run blocking crawl jobs concurrently while keeping one job per host at a time"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self.host_locks = {}
+
+    def _lock_for(self, host):
+        """Get (or create) the lock that serializes requests to a host"""
+        if host not in self.host_locks:
+            self.host_locks[host] = asyncio.Lock()
+        return self.host_locks[host]
+
+    async def _run_job(self, loop, executor, host, func, args):
+        """Run a single blocking job in the thread pool once its host is free"""
+        async with self._lock_for(host):
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except Exception as e:
+                print(f"Error crawling {host}: {e}")
+                return None
+
+    async def run(self, jobs):
+        """Run (host, func, args) jobs concurrently and return their results in order
+
+        Jobs for different hosts run in parallel; jobs for the same host wait
+        for each other so we never hit a site with more than one crawler.
+        """
+        loop = asyncio.get_running_loop()
+        # Lock objects are bound to the running loop, so start fresh each run
+        self.host_locks = {}
+        workers = self.max_workers or max(len(jobs), 1)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tasks = [self._run_job(loop, executor, host, func, args) for host, func, args in jobs]
+            return await asyncio.gather(*tasks)
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+# Response headers kept with a cached body and restored when it is served from cache
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+class HttpCache:
+    """On-disk cache of response bodies revalidated with conditional GETs
+
+    Responses that carry an ETag or Last-Modified validator are stored in
+    SQLite along with it. The next request for the same URL sends
+    If-None-Match / If-Modified-Since, and when the server answers 304 Not
+    Modified the stored body is served instead, so unchanged pages cost one
+    small round trip rather than a full download. The cache holds at most
+    `max_bytes` of bodies; past that, the least recently used entries are
+    evicted. Hits, misses and bytes saved are counted per host.
+    """
+
+    def __init__(self, path='http_cache.db', max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    encoding TEXT,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self.size > max_bytes:
+            with self._lock:
+                self._evict()
+
+    def conditional_headers(self, url):
+        """Validator headers to send for a URL, empty if nothing is cached for it"""
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def update(self, url, response):
+        """Serve a 304 from the cache, or store a fresh 200; returns the response to use
+
+        On a 304 the response is turned into the cached 200 in place, taking
+        any refreshed headers from the 304. Other statuses pass through.
+        """
+        host = urlsplit(url).netloc
+        if response.status_code == 304:
+            return self._serve(host, url, response)
+        if response.status_code == 200:
+            with self._lock:
+                self.counts[host]['misses'] += 1
+            self._store(host, url, response)
+        return response
+
+    def _serve(self, host, url, response):
+        """Fill a 304 response in with the cached body and headers"""
+        with self._lock:
+            row = self.conn.execute("SELECT headers, encoding, body FROM responses WHERE url = ?",
+                                    (url,)).fetchone()
+            if row is None:
+                # Evicted (or never stored) between sending the validators and the reply
+                self.counts[host]['stale'] += 1
+                return response
+            headers = json.loads(row[0])
+            headers.update({name: response.headers[name] for name in STORED_HEADERS if name in response.headers})
+            body = row[2]
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE responses SET etag = ?, last_modified = ?, headers = ?, last_used = ? WHERE url = ?",
+                    (headers.get('ETag'), headers.get('Last-Modified'), json.dumps(headers), time.time(), url))
+            self.counts[host]['hits'] += 1
+            self.counts[host]['bytes_saved'] += len(body)
+
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers.update(headers)
+        response._content = body
+        response.encoding = row[1]
+        response.from_cache = True
+        return response
+
+    def _store(self, host, url, response):
+        """Keep a 200 response if it has a validator to revalidate it with"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(url, host, etag, last_modified, headers, encoding, body, size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, host, etag, last_modified, json.dumps(headers), response.encoding, body, len(body),
+                     time.time()))
+            self.size += len(body) - (old[0] if old else 0)
+            self.counts[host]['stored'] += 1
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes; caller holds the lock"""
+        victims = []
+        excess = self.size - self.max_bytes
+        for url, host, size in self.conn.execute("SELECT url, host, size FROM responses ORDER BY last_used"):
+            if excess <= 0:
+                break
+            victims.append((url,))
+            excess -= size
+            self.size -= size
+            self.counts[host]['evicted'] += 1
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+
+    def stats(self):
+        """Per-host counts of hits (304s served from cache), misses, bytes saved, stores and evictions"""
+        with self._lock:
+            return {host: dict(counts) for host, counts in self.counts.items()}
+
+    def print_stats(self):
+        """Print hit rate and bytes saved for every host"""
+        print("\n=== HTTP Cache ===")
+        for host, counts in sorted(self.stats().items()):
+            hits = counts.get('hits', 0)
+            requests = hits + counts.get('misses', 0)
+            rate = hits / requests if requests else 0.0
+            print(f"{host}: {hits} hits, {counts.get('misses', 0)} misses ({rate:.0%} hit rate), "
+                  f"{counts.get('bytes_saved', 0) / 1024:.0f} KB saved, {counts.get('evicted', 0)} evicted")
+        print(f"Cache size: {self.size / 1024:.0f} KB of {self.max_bytes / 1024:.0f} KB")
+        print("=" * 30)
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,138 @@
+import sys
+import time
+import tracemalloc
+
+from classify import HITS_KEY
+from sites import PLACEHOLDERS
+from textanalysis import TEXT_KEY, field_text
+
+# Fields with few distinct values; every copy is interned so listings share one string
+INTERNED_FIELDS = frozenset(['company', 'location', 'source', 'category'])
+
+
+class Listing:
+    """Compact record for one scraped listing
+
+    Fields live in slots rather than a per-listing dict, and low-cardinality
+    values (company, location, source, category and placeholders such as
+    "See link for details") are interned so every listing shares one copy.
+    It still reads and writes like a dict - listing['title'], get(), items(),
+    dict(listing) - so code written against plain dicts keeps working, and
+    to_dict()/from_dict() convert either way. Fields that were never set are
+    simply absent, as with a dict.
+    """
+
+    FIELDS = ('title', 'company', 'location', 'description', 'url', 'source', 'category',
+              'sources', 'urls', 'original_url', TEXT_KEY, HITS_KEY)
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for field, value in fields.items():
+            self[field] = value
+
+    @classmethod
+    def from_dict(cls, values):
+        """Build a listing from a dict (or any mapping) of fields"""
+        return cls(**values)
+
+    def to_dict(self):
+        """Plain dict of the fields that are set"""
+        return dict(self.items())
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def __setitem__(self, field, value):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        if isinstance(value, str) and (field in INTERNED_FIELDS or value in PLACEHOLDERS):
+            value = sys.intern(value)
+        setattr(self, field, value)
+
+    def __contains__(self, field):
+        return field in self.__slots__ and hasattr(self, field)
+
+    def get(self, field, default=None):
+        """Value of a field, or `default` if it isn't set"""
+        return getattr(self, field, default) if field in self.__slots__ else default
+
+    def pop(self, field, default=None):
+        """Remove a field and return its value, or `default` if it isn't set"""
+        value = self.get(field, default)
+        if field in self:
+            delattr(self, field)
+        return value
+
+    def setdefault(self, field, default=None):
+        """Value of a field, setting it to `default` first if it isn't set"""
+        if field not in self:
+            self[field] = default
+        return self[field]
+
+    def keys(self):
+        """Names of the fields that are set, in FIELDS order"""
+        return [field for field in self.FIELDS if hasattr(self, field)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        """(field, value) pairs of the fields that are set"""
+        return [(field, getattr(self, field)) for field in self.keys()]
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so values are interned again in the receiving process
+        return (Listing.from_dict, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"Listing({self.to_dict()!r})"
+
+
+def benchmark(count=200_000):
+    """Compare the memory taken by `count` dict listings and `count` Listing records
+
+    Each record goes through what the scraper does to it - its title and
+    description are analysed for categorizing, then the analyses dropped -
+    so the numbers are for records as a finished run keeps them.
+    """
+    def fields(i):
+        # Fresh string objects, like a parser produces, for the repeated values
+        return {
+            'title': f"Summer Intern #{i}",
+            'company': "".join(["Not ", "specified"]) if i % 3 else f"Company {i % 500}",
+            'location': "".join(["Not ", "specified"]),
+            'description': "".join(["See link ", "for details"]),
+            'url': f"https://www.example.com/jobs/{i}",
+            'source': "".join(["Linked", "In"]),
+            'category': "".join(["Tech", "nology"]),
+        }
+
+    def kept(listing):
+        field_text(listing, 'title')
+        field_text(listing, 'description')
+        listing.pop(TEXT_KEY, None)
+        return listing
+
+    results = {}
+    print(f"\n=== Memory per Listing ({count:,} listings) ===")
+    for name, build in (('dict', lambda i: kept(fields(i))), ('Listing', lambda i: kept(Listing(**fields(i))))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        listings = [build(i) for i in range(count)]
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = size / count
+        print(f"{name}: {size / count:,.0f} bytes per listing, built in {elapsed:.2f} s")
+        del listings
+
+    print(f"Listing records use {1 - results['Listing'] / results['dict']:.0%} less memory")
+    print("=" * 30)
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,242 @@
+import csv
+import sqlite3
+import threading
+import time
+
+from listing import Listing
+from textanalysis import normalize
+from urls import listing_url
+
+# Listing fields stored as columns, in CSV order
+STORED_FIELDS = ('title', 'company', 'location', 'description', 'url', 'source', 'category',
+                 'sources', 'urls', 'original_url')
+# Fields holding lists, stored joined with LIST_SEPARATOR
+LIST_FIELDS = ('sources', 'urls')
+LIST_SEPARATOR = ' | '
+
+
+def listing_key(listing):
+    """Canonical key a listing is stored under: its canonical URL, or its normalized title and company
+
+    Normalizes directly rather than through field_text(), so storing a
+    record doesn't attach a text analysis to it again.
+    """
+    url = listing_url(listing)
+    if url:
+        return url
+    return "\x1f".join(normalize(listing.get(field) or '') for field in ('title', 'company'))
+
+
+class ListingStore:
+    """SQLite store of every listing ever scraped, upserted by canonical key
+
+    Each row keeps when the listing was first and last seen. Category,
+    source and both dates are indexed, and an FTS5 index covers title and
+    description, so questions like "new this week in Healthcare near
+    Atlanta" are one query instead of a pass over every dated CSV. Writes
+    are buffered and committed in a single transaction per run. The
+    listings_csv view has the CSV columns, and export_csv() writes any slice
+    of it as a CSV file. Listings a run skips as already processed can be
+    touch()ed so they still count as seen.
+    """
+
+    def __init__(self, path='internships.db'):
+        self.path = path
+        self.pending = []
+        self.touched = []
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = "".join(f"{field} TEXT, " for field in STORED_FIELDS)
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS listings (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    {columns}
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS listings_category ON listings (category, first_seen)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS listings_source ON listings (source, first_seen)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS listings_first_seen ON listings (first_seen)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS listings_last_seen ON listings (last_seen)")
+            self.conn.execute(f"""
+                CREATE VIEW IF NOT EXISTS listings_csv AS
+                SELECT id, {', '.join(STORED_FIELDS)}, first_seen, last_seen FROM listings
+            """)
+        self.fts = self._create_fts()
+
+    def _create_fts(self):
+        """Create the FTS5 index and the triggers keeping it in step; False if SQLite lacks FTS5"""
+        try:
+            with self.conn:
+                self.conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts
+                    USING fts5(title, description, content='listings', content_rowid='id')
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS listings_fts_insert AFTER INSERT ON listings BEGIN
+                        INSERT INTO listings_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+                    END
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS listings_fts_delete AFTER DELETE ON listings BEGIN
+                        INSERT INTO listings_fts (listings_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                    END
+                """)
+                # Upserts rewrite every row each run; only reindex text that actually changed
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS listings_fts_update AFTER UPDATE OF title, description ON listings
+                    WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+                        INSERT INTO listings_fts (listings_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                        INSERT INTO listings_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+                    END
+                """)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            return False
+
+    def _row(self, listing):
+        """Column values for one listing"""
+        values = [listing_key(listing)]
+        for field in STORED_FIELDS:
+            value = listing.get(field)
+            if field in LIST_FIELDS and isinstance(value, list):
+                value = LIST_SEPARATOR.join(value)
+            values.append(value)
+        return values
+
+    def add(self, listing):
+        """Buffer a listing for the next commit()"""
+        with self._lock:
+            self.pending.append(self._row(listing))
+
+    def touch(self, listing):
+        """Buffer a listing seen again but not re-added, so the next commit() moves its last_seen"""
+        with self._lock:
+            self.touched.append(listing_key(listing))
+
+    def commit(self, seen_at=None):
+        """Upsert every buffered listing in one transaction and return the timestamp used
+
+        New keys get first_seen = last_seen = seen_at; existing ones keep their
+        first_seen and take the new values and last_seen. Touched listings
+        only get the new last_seen.
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        with self._lock:
+            if not self.pending and not self.touched:
+                return seen_at
+            updates = ", ".join(f"{field} = excluded.{field}" for field in STORED_FIELDS)
+            with self.conn:
+                self.conn.executemany(f"""
+                    INSERT INTO listings (key, {', '.join(STORED_FIELDS)}, first_seen, last_seen)
+                    VALUES ({', '.join('?' * (len(STORED_FIELDS) + 3))})
+                    ON CONFLICT (key) DO UPDATE SET {updates}, last_seen = excluded.last_seen
+                """, [row + [seen_at, seen_at] for row in self.pending])
+                self.conn.executemany("UPDATE listings SET last_seen = ? WHERE key = ?",
+                                      [(seen_at, key) for key in self.touched])
+            self.pending = []
+            self.touched = []
+        return seen_at
+
+    def save(self, listings, seen_at=None):
+        """Upsert a run's listings in one transaction and return the timestamp used"""
+        for listing in listings:
+            self.add(listing)
+        return self.commit(seen_at)
+
+    def _where(self, category=None, source=None, location=None, text=None, new_since=None, seen_since=None):
+        """SQL conditions and parameters for the query filters"""
+        conditions = []
+        params = []
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        if source is not None:
+            conditions.append("source = ?")
+            params.append(source)
+        if location is not None:
+            conditions.append("location LIKE ?")
+            params.append(f"%{location}%")
+        if new_since is not None:
+            conditions.append("first_seen >= ?")
+            params.append(new_since)
+        if seen_since is not None:
+            conditions.append("last_seen >= ?")
+            params.append(seen_since)
+        if text is not None:
+            if self.fts:
+                conditions.append("id IN (SELECT rowid FROM listings_fts WHERE listings_fts MATCH ?)")
+                params.append(text)
+            else:
+                conditions.append("(title LIKE ? OR description LIKE ?)")
+                params.extend([f"%{text}%"] * 2)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def query(self, limit=None, **filters):
+        """Listings matching the filters, newest first
+
+        Filters: category, source, location (substring), text (FTS5 query over
+        title and description), new_since (first seen at or after, Unix time)
+        and seen_since (last seen at or after).
+        """
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM listings{where} ORDER BY first_seen DESC, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        listings = []
+        for row in rows:
+            fields = {field: row[field] for field in STORED_FIELDS if row[field] is not None}
+            for field in LIST_FIELDS:
+                if field in fields:
+                    fields[field] = fields[field].split(LIST_SEPARATOR)
+            listings.append(Listing(**fields))
+        return listings
+
+    def count_by(self, column, **filters):
+        """{value: count} of an indexed column (category or source) over the matching listings"""
+        if column not in ('category', 'source'):
+            raise ValueError(f"Can't group by {column}")
+        where, params = self._where(**filters)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {column}, COUNT(*) FROM listings{where} GROUP BY {column} ORDER BY COUNT(*) DESC",
+                params).fetchall()
+        return {value: count for value, count in rows}
+
+    def export_csv(self, filename, fields=STORED_FIELDS, **filters):
+        """Write the listings_csv view, filtered like query(), to a CSV file and return the row count"""
+        where, params = self._where(**filters)
+        count = 0
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(fields)} FROM listings_csv{where} ORDER BY id",
+                                     params)
+            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fields)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+        return count
+
+    def __len__(self):
+        """Number of listings stored"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def close(self):
+        """Write any buffered listings and close the database"""
+        self.commit()
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,277 @@
+import math
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ratelimit import HostRateLimiter
+from retry import RetryPolicy
+from sites import SITE_SPECS
+
+# Title words that spread the synthetic listings over the categories
+TITLE_TOPICS = ['Software Development', 'Clinical Research', 'Marketing', 'Biology Lab', 'Graphic Design',
+                'Tutoring', 'Public Policy', 'Mechanical Engineering', 'Data Science', 'Journalism']
+COMPANIES = [f"Mock Company {i}" for i in range(200)]
+LOCATIONS = ['Remote', 'New York, NY', 'Atlanta, GA', 'Austin, TX', 'Chicago, IL', 'Seattle, WA']
+# Page chrome around the cards, so pages are about as heavy as the real ones
+FILLER = "".join(f'<li class="nav-item"><a href="/section/{i}">Section {i}</a></li>' for i in range(150))
+
+
+def fixed(seconds):
+    """Latency distribution that always takes `seconds`"""
+    return lambda rng: seconds
+
+
+def uniform(low, high):
+    """Latency distribution uniform between two bounds"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median, sigma=0.5):
+    """Long-tailed latency distribution around a median, as real servers show"""
+    return lambda rng: median * math.exp(sigma * rng.gauss(0, 1))
+
+
+def class_name(class_):
+    """A concrete class attribute value that a spec's (string or regex) class matches"""
+    if class_ is None or isinstance(class_, str):
+        return class_
+    if class_.search(class_.pattern):
+        return class_.pattern
+    raise ValueError(f"Can't make up a class matching {class_.pattern!r}")
+
+
+class MockSite:
+    """Local HTTP server that serves synthetic listing pages for one site spec
+
+    Every page holds `cards_per_page` cards built from the spec's card and
+    field selectors, so the real extraction plan parses them. A page's
+    cards depend only on its URL. Responses are held back by a draw from
+    `latency` (a function of a random.Random), answered with 429 and
+    Retry-After at `error_rate`, and at `trickle_rate` the body dribbles out
+    `trickle_chunk` bytes at a time with `trickle_delay` seconds between
+    chunks. Served requests, 429s, trickled bodies and bytes are counted.
+    """
+
+    def __init__(self, spec, cards_per_page=20, latency=lognormal(0.05), error_rate=0.0, retry_after=1,
+                 trickle_rate=0.0, trickle_chunk=1024, trickle_delay=0.05, seed=0):
+        self.spec = spec
+        self.cards_per_page = cards_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.trickle_rate = trickle_rate
+        self.trickle_chunk = trickle_chunk
+        self.trickle_delay = trickle_delay
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.server = None
+
+    @property
+    def origin(self):
+        """Scheme, host and port the server answers on"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def local_spec(self, pages=None):
+        """Copy of the site spec pointed at this server, optionally fetching a different number of pages"""
+        spec = dict(self.spec)
+        path = self.spec['url'].split('/', 3)[3]
+        spec['url'] = f"{self.origin}/{path}"
+        if 'base_url' in spec:
+            spec['base_url'] = self.origin
+        if pages is not None:
+            spec['pages'] = pages
+        return spec
+
+    def card(self, key, index):
+        """Markup of one listing card"""
+        rng = random.Random(key * 1000 + index)
+        values = {
+            'title': f"{rng.choice(TITLE_TOPICS)} Intern #{key % 100000}-{index}",
+            'company': rng.choice(COMPANIES),
+            'location': rng.choice(LOCATIONS),
+            'description': f"Summer program for high school students, listing {key}-{index}.",
+        }
+        fields = []
+        for field, (tag, class_) in self.spec['fields'].items():
+            attributes = f' class="{class_name(class_)}"' if class_ else ''
+            if field == self.spec.get('link'):
+                attributes += f' href="/listing/{key}-{index}"'
+            fields.append(f"<{tag}{attributes}>{values.get(field, 'View listing')}</{tag}>")
+        tag, class_ = self.spec['card']
+        return f'<{tag} class="{class_name(class_)} mock-card">{"".join(fields)}</{tag}>'
+
+    def page(self, path):
+        """Full page of cards for a request path"""
+        key = zlib.crc32(f"{self.spec['name']}{path}".encode('utf-8'))
+        cards = "".join(self.card(key, i) for i in range(self.cards_per_page))
+        return (f"<html><head><title>{self.spec['name']}</title><script>var t = {time.time()};</script></head>"
+                f"<body><ul class=\"nav\">{FILLER}</ul><main>{cards}</main></body></html>").encode('utf-8')
+
+    def _handler(self):
+        """Request handler class bound to this site"""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                with site._lock:
+                    delay = max(site.latency(site.random), 0.0)
+                    throttled = site.random.random() < site.error_rate
+                    trickled = site.random.random() < site.trickle_rate
+                    site.counts['requests'] += 1
+                time.sleep(delay)
+
+                if throttled:
+                    with site._lock:
+                        site.counts['429s'] += 1
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(site.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                body = site.page(self.path)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if trickled:
+                    for start in range(0, len(body), site.trickle_chunk):
+                        self.wfile.write(body[start:start + site.trickle_chunk])
+                        self.wfile.flush()
+                        time.sleep(site.trickle_delay)
+                else:
+                    self.wfile.write(body)
+                with site._lock:
+                    site.counts['trickled'] += trickled
+                    site.counts['bytes'] += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, host='127.0.0.1', port=0):
+        """Start serving in a background thread and return the origin"""
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.origin
+
+    def stop(self):
+        """Stop the server"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(values, fraction):
+    """Value below which `fraction` of the sorted values fall"""
+    if not values:
+        return 0.0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def load_test(pages=5, cards_per_page=20, latency=lognormal(0.05), error_rate=0.05, trickle_rate=0.05,
+              trickle_delay=0.05, rate=5.0, burst=5, max_concurrency=4, use_async=False, seed=0):
+    """Run the scraper against a mock of every source site and print throughput, latency and error handling
+
+    Returns the report as a dict.
+    """
+    from webScraper import InternshipScraper
+
+    sites = [MockSite(spec, cards_per_page=cards_per_page, latency=latency, error_rate=error_rate,
+                      trickle_rate=trickle_rate, trickle_delay=trickle_delay, seed=seed + i)
+             for i, spec in enumerate(SITE_SPECS)]
+    for site in sites:
+        site.start()
+
+    # Unbounded attempt history, so every request's latency is in the report
+    retry_policy = RetryPolicy(connect_timeout=5, read_timeout=20, max_retries=3, backoff_base=0.5,
+                               source_deadline=300, history_size=None)
+    scraper = InternshipScraper(site_specs=[site.local_spec(pages) for site in sites],
+                                rate_limiter=HostRateLimiter(rate=rate, burst=burst, max_concurrency=max_concurrency),
+                                retry_policy=retry_policy, near_dup_threshold=None)
+    try:
+        start = time.perf_counter()
+        if use_async:
+            import asyncio
+            internships = asyncio.run(scraper.run_scraper_async(target_count=10 ** 9))
+        else:
+            internships = scraper.run_scraper(target_count=10 ** 9)
+        elapsed = time.perf_counter() - start
+    finally:
+        scraper.close()
+        for site in sites:
+            site.stop()
+
+    attempts = list(retry_policy.attempts)
+    latencies = sorted(attempt['elapsed'] for attempt in attempts)
+    waits = sorted(attempt['waited'] for attempt in attempts)
+    outcomes = Counter(attempt['outcome'] for attempt in attempts)
+    outcomes['retries'] = sum(1 for attempt in attempts if attempt['attempt'] > 0)
+    fetched = {attempt['url'] for attempt in attempts if attempt['status'] == 200}
+    expected = len(sites) * pages
+    served = Counter()
+    for site in sites:
+        served.update(site.counts)
+
+    report = {
+        'elapsed': elapsed,
+        'pages': len(fetched),
+        'pages_lost': expected - len(fetched),
+        'listings': len(internships),
+        'requests': len(attempts),
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+        'wait_p50': percentile(waits, 0.5),
+        'wait_max': waits[-1] if waits else 0.0,
+        'outcomes': dict(outcomes),
+        'served': dict(served),
+    }
+
+    print(f"\n=== Load Test ({len(sites)} sites x {pages} pages, {'async' if use_async else 'sequential'}) ===")
+    print(f"Pages: {report['pages']} of {expected} in {elapsed:.1f} s "
+          f"({report['pages'] / elapsed:.1f} pages/s, {report['listings'] / elapsed:.0f} listings/s)")
+    print(f"Listings: {report['listings']}")
+    print(f"Request latency: p50 {report['p50'] * 1000:.0f} ms, p95 {report['p95'] * 1000:.0f} ms, "
+          f"p99 {report['p99'] * 1000:.0f} ms, max {report['max'] * 1000:.0f} ms")
+    print(f"Pacing waits: p50 {report['wait_p50'] * 1000:.0f} ms, max {report['wait_max'] * 1000:.0f} ms")
+    print(f"Server: {served['requests']} requests, {served['429s']} answered 429, "
+          f"{served['trickled']} bodies trickled, {served['bytes'] / 1024:.0f} KB sent")
+    print("Client: " + ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())))
+    print(f"Pages lost: {report['pages_lost']}")
+    print("=" * 30)
+    return report
+
+
+if __name__ == "__main__":
+    # python mocksites.py [pages] [error rate] [async]  - load-test the scraper against local mock sites
+    # python mocksites.py serve                         - just serve the mock sites until interrupted
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        mock_sites = [MockSite(spec, error_rate=0.05, trickle_rate=0.05) for spec in SITE_SPECS]
+        for mock_site in mock_sites:
+            print(f"{mock_site.spec['name']}: {mock_site.start()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for mock_site in mock_sites:
+                mock_site.stop()
+    else:
+        load_test(pages=int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+                  error_rate=float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+                  use_async=len(sys.argv) > 3 and sys.argv[3] == 'async')
@@ -0,0 +1,218 @@
+import random
+import time
+import zlib
+from array import array
+from collections import Counter
+
+from sites import PLACEHOLDERS
+from textanalysis import field_text
+
+# Mersenne prime for the (a * x + b) mod p permutations; results are kept to 32 bits
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+# Mixed into company shingles so they never equal the same words in a title
+_COMPANY_SALT = 0x9E3779B9
+# Words nearly every listing title carries; they say nothing about which listing it is
+BOILERPLATE = {zlib.crc32(word.encode('utf-8')) for word in
+               ['intern', 'interns', 'internship', 'internships', 'summer', 'high', 'school', 'student',
+                'students', 'program', 'opportunity', 'paid', 'unpaid', 'remote']
+               + [str(year) for year in range(2020, 2036)]}
+
+
+def _integrate(f, low, high, steps=100):
+    """Midpoint-rule integral of f over [low, high]"""
+    width = (high - low) / steps
+    return sum(f(low + (k + 0.5) * width) for k in range(steps)) * width
+
+
+def _optimal_bands(num_perm, threshold, false_positive_weight=0.3, false_negative_weight=0.7):
+    """Pick (bands, rows) minimizing the weighted chance of missing or wrongly proposing a pair
+
+    Candidates are verified exactly afterwards, so a false positive only costs
+    a comparison while a false negative is a duplicate let through; misses are
+    weighted more heavily.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        false_positive = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_negative = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = false_positive_weight * false_positive + false_negative_weight * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateIndex:
+    """Groups near-duplicate listings with MinHash signatures and LSH banding
+
+    A listing's shingles are the adjacent word pairs of its title and of its
+    company, with boilerplate words ("intern", "summer", years) and
+    placeholder companies left out. Pairs are unordered and punctuation is
+    ignored, so "IT Intern - Summer 2025" and "Intern, IT (Summer 2025)" are
+    identical, while formulaic titles that share most of their words still
+    differ in most of their shingles. Signatures are split into bands and
+    only listings sharing a band are compared, at most `max_bucket_scan` of
+    the latest per bucket, which keeps adding a listing close to constant
+    time instead of comparing against everything.
+    Two listings are near-duplicates when the Jaccard similarity of their
+    shingles is at least `threshold`; candidates are checked exactly, so the
+    MinHash estimate only decides who gets compared.
+    """
+
+    # Stop memoizing new shingle hashes once this many have been seen (512 bytes each)
+    MAX_CACHED_SHINGLES = 20_000
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=None, seed=1, max_bucket_scan=32):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.max_bucket_scan = max_bucket_scan
+        if bands is None:
+            bands, rows = _optimal_bands(num_perm, threshold)
+        else:
+            rows = num_perm // bands
+        self.bands = bands
+        self.rows = rows
+
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        # shingle -> its num_perm permuted hashes; vocabularies are small, so
+        # most listings are signed from cached vectors only
+        self.shingle_hashes = {}
+        # one dict per band: band bytes -> ids of cluster representatives
+        self.buckets = [{} for _ in range(bands)]
+        # representative id -> its shingles, for exact verification
+        self.representatives = {}
+        self.parent = []
+        self.comparisons = 0
+
+    @staticmethod
+    def _word_pairs(hashes):
+        """Unordered adjacent pairs of the non-boilerplate word hashes, or the lone word if there's one"""
+        words = [word for word in hashes if word not in BOILERPLATE]
+        if len(words) == 1:
+            return set(words)
+        return {(min(first, second) << 32) | max(first, second) for first, second in zip(words, words[1:])}
+
+    def shingles(self, listing):
+        """Title word pairs plus company word pairs, from the listing's cached tokens"""
+        shingles = self._word_pairs(field_text(listing, 'title').hashes)
+        if listing.get('company') not in PLACEHOLDERS:
+            shingles |= {pair ^ _COMPANY_SALT for pair in self._word_pairs(field_text(listing, 'company').hashes)}
+        return shingles
+
+    def _hashes(self, shingle):
+        """The permuted hashes of one shingle"""
+        hashes = self.shingle_hashes.get(shingle)
+        if hashes is None:
+            hashes = array('I', [((a * shingle + b) % _PRIME) & _MASK for a, b in self.permutations])
+            if len(self.shingle_hashes) < self.MAX_CACHED_SHINGLES:
+                self.shingle_hashes[shingle] = hashes
+        return hashes
+
+    def signature(self, shingles):
+        """MinHash signature of a non-empty shingle set"""
+        return array('I', map(min, zip(*map(self._hashes, shingles))))
+
+    @staticmethod
+    def similarity(first, second):
+        """Jaccard similarity of two shingle sets"""
+        return len(first & second) / len(first | second)
+
+    def _find(self, i):
+        """Cluster root of listing i, compressing the path on the way"""
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def add(self, listing):
+        """Index a listing and return its id plus the id of an earlier near-duplicate, or None
+
+        Ids count up from 0 in the order listings are added.
+        """
+        i = len(self.parent)
+        self.parent.append(i)
+        shingles = self.shingles(listing)
+        if not shingles:
+            return i, None
+
+        signature = self.signature(shingles)
+        rows = self.rows
+        keys = [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+        checked = set()
+        scan = self.max_bucket_scan
+        for band, key in enumerate(keys):
+            # Newest first: a hot bucket only costs the latest few comparisons
+            for j in reversed(self.buckets[band].get(key, ())[-scan:]):
+                if j in checked:
+                    continue
+                checked.add(j)
+                self.comparisons += 1
+                if self.similarity(shingles, self.representatives[j]) >= self.threshold:
+                    root = self._find(j)
+                    self.parent[i] = root
+                    return i, root
+
+        # Only cluster representatives go into the buckets, so a big cluster
+        # costs one comparison per band rather than one per member
+        self.representatives[i] = frozenset(shingles)
+        for band, key in enumerate(keys):
+            self.buckets[band].setdefault(key, []).append(i)
+        return i, None
+
+    def clusters(self):
+        """Lists of listing ids that are near-duplicates of each other, largest first"""
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self._find(i), []).append(i)
+        return sorted((ids for ids in groups.values() if len(ids) > 1), key=len, reverse=True)
+
+    def cluster_sizes(self):
+        """Counter of cluster size -> number of clusters of that size"""
+        return Counter(len(ids) for ids in self.clusters())
+
+    def print_report(self):
+        """Print how many near-duplicates were found and how big their clusters are"""
+        clusters = self.clusters()
+        print("\n=== Near-Duplicates ===")
+        print(f"Listings: {len(self.parent)}, clusters: {len(clusters)}, "
+              f"duplicates removed: {sum(len(ids) - 1 for ids in clusters)}")
+        print(f"Threshold {self.threshold} ({self.bands} bands x {self.rows} rows), "
+              f"{self.comparisons} comparisons")
+        for size, count in sorted(self.cluster_sizes().items(), reverse=True):
+            print(f"Size {size}: {count}")
+        print("=" * 30)
+
+
+def benchmark(count=200_000, threshold=0.8):
+    """Time near-duplicate detection over `count` synthetic listings"""
+    rng = random.Random(0)
+    roles = ["IT", "Marketing", "Research", "Design", "Software", "Finance", "Nursing", "Policy"]
+    syllables = ["ka", "lo", "mi", "ra", "ten", "vo", "zu", "bel", "dor", "fi", "gan", "hu", "jor", "nex", "pra"]
+    companies = [" ".join("".join(rng.choices(syllables, k=3)).title() for _ in range(2)) for _ in range(count // 10)]
+    forms = ["{role} Intern - Summer 2025", "Intern, {role} (Summer 2025)", "Summer 2025 {role} Internship"]
+    listings = []
+    for i in range(count):
+        role = roles[i % len(roles)]
+        listings.append({'title': forms[i % len(forms)].format(role=role),
+                         'company': companies[(i * 7919) % len(companies)]})
+
+    index = NearDuplicateIndex(threshold=threshold)
+    start = time.perf_counter()
+    for listing in listings:
+        index.add(listing)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n=== Indexed {count:,} listings in {elapsed:.2f} s ({count / elapsed:,.0f}/s) ===")
+    index.print_report()
+    return elapsed
+
+
+if __name__ == "__main__":
+    benchmark()
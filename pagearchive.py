@@ -0,0 +1,154 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+
+class PageArchive:
+    """Append-only, content-addressed archive of every raw page fetched
+
+    Page bodies are zlib-compressed and appended to one pack file, keyed by
+    the BLAKE2b digest of the raw bytes, so a page that comes back unchanged
+    is stored once however often it is fetched. A SQLite index records each
+    fetch (URL, source, time, encoding) against the digest it returned and
+    where that digest lives in the pack. Nothing is ever rewritten: a write is
+    one compression, one append and one index insert, cheap enough to leave
+    on for every run. Archived pages can be parsed again later with the
+    current site specs (see InternshipScraper.reparse_archive).
+    """
+
+    def __init__(self, path='page_archive', level=6):
+        self.path = path
+        self.level = level
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self.pack = open(os.path.join(path, 'pages.pack'), 'ab')
+        self.conn = sqlite3.connect(os.path.join(path, 'index.db'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest BLOB PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS fetches (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    source TEXT,
+                    fetched_at REAL NOT NULL,
+                    digest BLOB NOT NULL,
+                    encoding TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS fetches_source ON fetches (source, fetched_at)")
+
+    def add(self, url, content, encoding=None, source=None, fetched_at=None):
+        """Archive one fetched page and return its digest"""
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            known = self.conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            with self.conn:
+                if known is None:
+                    data = zlib.compress(content, self.level)
+                    offset = self.pack.tell()
+                    self.pack.write(data)
+                    # The index must never point past what the pack holds
+                    self.pack.flush()
+                    self.conn.execute("INSERT INTO blobs (digest, offset, length, size) VALUES (?, ?, ?, ?)",
+                                      (digest, offset, len(data), len(content)))
+                    self.counts['stored'] += 1
+                    self.counts['stored_bytes'] += len(data)
+                else:
+                    self.counts['deduplicated'] += 1
+                self.conn.execute("INSERT INTO fetches (url, source, fetched_at, digest, encoding) "
+                                  "VALUES (?, ?, ?, ?, ?)", (url, source, fetched_at, digest, encoding))
+            self.counts['pages'] += 1
+            self.counts['raw_bytes'] += len(content)
+        return digest
+
+    def get(self, digest):
+        """Raw bytes of an archived page"""
+        with self._lock:
+            row = self.conn.execute("SELECT offset, length FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest.hex())
+        with open(self.pack.name, 'rb') as f:
+            f.seek(row[0])
+            return zlib.decompress(f.read(row[1]))
+
+    def fetches(self, source=None, url=None, since=None, until=None, distinct=False):
+        """(url, source, fetched_at, digest, encoding) rows of archived fetches, oldest first
+
+        With distinct, each page body is listed once, at its first fetch.
+        """
+        conditions = []
+        params = []
+        for column, op, value in (('source', '=', source), ('url', '=', url),
+                                  ('fetched_at', '>=', since), ('fetched_at', '<', until)):
+            if value is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if distinct:
+            sql = (f"SELECT url, source, MIN(fetched_at), digest, encoding FROM fetches{where} "
+                   f"GROUP BY digest ORDER BY MIN(fetched_at), MIN(id)")
+        else:
+            sql = f"SELECT url, source, fetched_at, digest, encoding FROM fetches{where} ORDER BY fetched_at, id"
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def stats(self):
+        """Totals for the whole archive: fetches, distinct pages, raw and compressed bytes"""
+        with self._lock:
+            fetches = self.conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0]
+            blobs, raw, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) FROM blobs").fetchone()
+        return {'fetches': fetches, 'pages': blobs, 'raw_bytes': raw, 'stored_bytes': stored}
+
+    def print_stats(self):
+        """Print what this run archived and the size of the whole archive"""
+        totals = self.stats()
+        print("\n=== Page Archive ===")
+        print(f"This run: {self.counts['pages']} pages archived, {self.counts['stored']} new, "
+              f"{self.counts['deduplicated']} unchanged")
+        print(f"Archive: {totals['fetches']} fetches of {totals['pages']} distinct pages, "
+              f"{totals['raw_bytes'] / 1024:.0f} KB stored in {totals['stored_bytes'] / 1024:.0f} KB")
+        print("=" * 30)
+
+    def close(self):
+        """Close the pack file and the index"""
+        with self._lock:
+            self.pack.close()
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # python pagearchive.py                        - archive summary
+    # python pagearchive.py reparse [YYYY-MM-DD]   - rebuild listings from archived pages, optionally since a date
+    from webScraper import InternshipScraper
+
+    archive = PageArchive('page_archive')
+    if len(sys.argv) > 1 and sys.argv[1] == 'reparse':
+        since = datetime.strptime(sys.argv[2], "%Y-%m-%d").timestamp() if len(sys.argv) > 2 else None
+        scraper = InternshipScraper()
+        listings = scraper.reparse_archive(archive, since=since)
+        print(f"Rebuilt {len(listings)} internships from archived pages")
+        scraper.save_to_csv(f"reparsed_internships_{datetime.now().strftime('%Y-%m-%d')}.csv")
+        scraper.print_by_category()
+        scraper.close()
+    archive.print_stats()
+    archive.close()
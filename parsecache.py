@@ -0,0 +1,121 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+from listing import Listing
+from textanalysis import TEXT_KEY
+
+# Scripts carry per-request noise (nonces, tokens, timings) and never hold listing fields
+_SCRIPT = re.compile(rb'<script\b.*?</script\s*>', re.S | re.I)
+
+
+def card_pattern(tag, class_):
+    """Regex over raw page bytes matching the opening tag of a listing card"""
+    if class_ is None:
+        class_match = b''
+    elif hasattr(class_, 'pattern'):
+        class_match = rb'[^"\'>]*' + class_.pattern.encode('utf-8')
+    else:
+        class_match = rb'(?:[^"\'>]*\s)?' + re.escape(class_.encode('utf-8')) + rb'(?=[\s"\'>])'
+    return re.compile(rb'<' + re.escape(tag.encode('utf-8')) + rb'\b[^>]*?\bclass\s*=\s*["\']?' + class_match,
+                      re.I)
+
+
+class ParseCache:
+    """Listings already extracted from a page, keyed by a fingerprint of its card region
+
+    The fingerprint hashes the page from its first listing card onwards with
+    scripts removed, so the header chrome, tracking scripts and nonces that
+    differ on every load don't defeat it, together with the plan's site spec
+    and a caller-supplied context (the category keywords). A page whose
+    fingerprint was seen before is answered with the stored records, already
+    categorized, without being parsed. Entries not used for `ttl_days`
+    expire. Parses saved are counted per source.
+    """
+
+    def __init__(self, path='parse_cache.db', ttl_days=30):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.patterns = {}
+        self.counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    fingerprint BLOB PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    records TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+            if self.ttl:
+                self.conn.execute("DELETE FROM pages WHERE last_used < ?", (time.time() - self.ttl,))
+
+    def card_region(self, plan, markup):
+        """The part of a raw page the plan's listings come from"""
+        if isinstance(markup, str):
+            markup = markup.encode('utf-8')
+        pattern = self.patterns.get(plan.name)
+        if pattern is None:
+            pattern = self.patterns[plan.name] = card_pattern(plan.card_parser.name, plan.card_parser.class_)
+        match = pattern.search(markup)
+        # No card found in the raw bytes: fall back to the whole page
+        return _SCRIPT.sub(b'', markup[match.start():] if match else markup)
+
+    def fingerprint(self, plan, markup, context=''):
+        """16-byte fingerprint of a page's card region under a plan"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{plan.signature}\x1f{context}\x1f".encode('utf-8'))
+        digest.update(self.card_region(plan, markup))
+        return digest.digest()
+
+    def get(self, source, fingerprint):
+        """Listings stored for a fingerprint, or None if the page has to be parsed"""
+        with self._lock:
+            row = self.conn.execute("SELECT records FROM pages WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is None:
+                self.counts[source]['parsed'] += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE pages SET last_used = ? WHERE fingerprint = ?", (time.time(), fingerprint))
+            records = json.loads(row[0])
+            self.counts[source]['saved'] += 1
+            self.counts[source]['listings'] += len(records)
+        return [Listing.from_dict(record) for record in records]
+
+    def put(self, source, fingerprint, listings):
+        """Store the listings extracted from a page under its fingerprint"""
+        records = json.dumps([{field: value for field, value in listing.items() if field != TEXT_KEY}
+                              for listing in listings])
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO pages (fingerprint, source, records, last_used) VALUES (?, ?, ?, ?)",
+                    (fingerprint, source, records, time.time()))
+
+    def stats(self):
+        """Per-source counts of pages parsed, parses saved and listings served from the cache"""
+        with self._lock:
+            return {source: dict(counts) for source, counts in self.counts.items()}
+
+    def print_stats(self):
+        """Print how many parses the cache saved for every source"""
+        print("\n=== Parse Cache ===")
+        for source, counts in sorted(self.stats().items()):
+            saved = counts.get('saved', 0)
+            print(f"{source}: {saved} of {saved + counts.get('parsed', 0)} pages unchanged, "
+                  f"{counts.get('listings', 0)} listings reused without parsing")
+        print("=" * 30)
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self.conn.close()
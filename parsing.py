@@ -0,0 +1,244 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from listing import Listing
+from sites import FIELD_DEFAULTS
+from textanalysis import TEXT_KEY, TextAnalysis
+from urls import canonicalize_url
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_BACKEND = 'lxml'
+except ImportError:
+    DEFAULT_BACKEND = 'html.parser'
+
+
+class CardParser:
+    """Parse only the listing cards out of a page instead of building the whole DOM"""
+
+    def __init__(self, name, class_, backend=None, strain=True):
+        self.name = name
+        self.class_ = class_
+        self.backend = backend or DEFAULT_BACKEND
+        self.strainer = SoupStrainer(name, class_=self._strain_class(class_)) if strain else None
+
+    @staticmethod
+    def _strain_class(class_):
+        """Class filter for the strainer, which sees the raw unsplit class attribute while parsing"""
+        if class_ is None or hasattr(class_, 'search'):
+            return class_
+        return re.compile(r'(?:^|\s)' + re.escape(class_) + r'(?:\s|$)')
+
+    def parse(self, markup, encoding=None):
+        """Return the card elements found in a page (raw bytes are decoded using `encoding` if given)"""
+        if encoding and isinstance(markup, bytes):
+            soup = BeautifulSoup(markup, self.backend, parse_only=self.strainer, from_encoding=encoding)
+        else:
+            soup = BeautifulSoup(markup, self.backend, parse_only=self.strainer)
+        return soup.find_all(self.name, class_=self.class_)
+
+
+def _class_matcher(class_):
+    """Build a predicate over a tag's class list that matches like BeautifulSoup's class_ argument"""
+    if class_ is None:
+        return lambda classes: True
+    if hasattr(class_, 'search'):
+        return lambda classes: (any(class_.search(c) for c in classes)
+                                or (len(classes) > 1 and class_.search(' '.join(classes)) is not None))
+    return lambda classes: class_ in classes or (len(classes) > 1 and ' '.join(classes) == class_)
+
+
+class ExtractionPlan:
+    """A site spec compiled once into a card parser and a single-pass field matcher"""
+
+    def __init__(self, spec, backend=None, strain=True, keep_original_url=False):
+        self.name = spec['name']
+        self.url = spec['url']
+        self.host = urlsplit(self.url).netloc
+        self.origin = f"{urlsplit(self.url).scheme}://{self.host}"
+        # Identifies the spec, so extractions cached under an older spec aren't reused
+        self.signature = f"{spec!r}\x1f{keep_original_url}"
+        self.first_page = spec.get('first_page', 1)
+        self.page_step = spec.get('page_step', 1)
+        self.pages = spec.get('pages', 1)
+
+        card_tag, card_class = spec['card']
+        self.card_parser = CardParser(card_tag, card_class, backend=backend, strain=strain)
+        self.matchers = [(field, tag, _class_matcher(class_)) for field, (tag, class_) in spec['fields'].items()]
+
+        self.link = spec.get('link')
+        self.base_url = spec.get('base_url', '')
+        self.url_params = spec.get('url_params')
+        self.url_host = spec.get('url_host')
+        self.keep_original_url = keep_original_url
+        self.fixed = dict(spec.get('fixed', {}))
+        self.defaults = dict(FIELD_DEFAULTS, **spec.get('defaults', {}))
+        self.require = spec.get('require')
+
+    def page_urls(self, num_pages=None):
+        """URLs of the listing pages to fetch, in order"""
+        count = self.pages if num_pages is None else num_pages
+        return [self.url.format(page=self.first_page + i * self.page_step) for i in range(count)]
+
+    def _match_fields(self, card):
+        """Find the first element for every field in one walk over the card"""
+        found = {}
+        pending = self.matchers
+        for elem in card.descendants:
+            if not pending:
+                break
+            if elem.name is None:
+                continue
+            classes = elem.get('class') or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            remaining = []
+            for matcher in pending:
+                field, tag, match = matcher
+                if elem.name == tag and match(classes):
+                    found[field] = elem
+                else:
+                    remaining.append(matcher)
+            pending = remaining
+        return found
+
+    def extract_card(self, card):
+        """Turn one card element into a Listing, or None if it isn't a match"""
+        found = self._match_fields(card)
+        title_elem = found.get('title')
+        if title_elem is None:
+            return None
+
+        # The title is analysed once here and the tokens travel with the listing
+        title_text = TextAnalysis(title_elem.text.strip())
+        if self.require and not title_text.has_word_containing(self.require):
+            return None
+
+        listing = Listing(title=title_text.text)
+        for field in ('company', 'location', 'description'):
+            if field in self.fixed:
+                listing[field] = self.fixed[field]
+            elif field in found:
+                listing[field] = found[field].text.strip()
+            else:
+                listing[field] = self.defaults[field]
+
+        link_elem = found.get(self.link)
+        if link_elem is not None and link_elem.has_attr('href'):
+            original_url = self.base_url + link_elem['href']
+            listing['url'] = canonicalize_url(original_url, self.url_params, self.url_host)
+        else:
+            original_url = listing['url'] = self.defaults['url']
+        listing['source'] = self.name
+        if self.keep_original_url:
+            listing['original_url'] = original_url
+        listing[TEXT_KEY] = {'title': title_text}
+        return listing
+
+    def extract(self, markup, encoding=None):
+        """Extract every matching listing from a page"""
+        listings = []
+        for card in self.card_parser.parse(markup, encoding):
+            try:
+                listing = self.extract_card(card)
+            except Exception as e:
+                print(f"Error parsing {self.name} listing: {e}")
+                continue
+            if listing:
+                listings.append(listing)
+        return listings
+
+
+def compile_specs(specs, backend=None, strain=True, keep_original_url=False):
+    """Compile site specs into extraction plans keyed by source name"""
+    return {spec['name']: ExtractionPlan(spec, backend=backend, strain=strain, keep_original_url=keep_original_url)
+            for spec in specs}
+
+
+# Extraction plans for the current parse worker process, built once by _init_worker
+_worker_plans = None
+
+
+def _init_worker(specs, backend, strain, keep_original_url):
+    """Compile the site specs once in each worker process"""
+    global _worker_plans
+    _worker_plans = compile_specs(specs, backend=backend, strain=strain, keep_original_url=keep_original_url)
+
+
+def _extract_batch(batch):
+    """Extract listings for a batch of (source name, markup, encoding) pages inside a worker"""
+    return [_worker_plans[name].extract(markup, encoding) for name, markup, encoding in batch]
+
+
+class ParsePool:
+    """Process pool that turns raw listing pages into Listing records on every core"""
+
+    def __init__(self, specs, workers=None, chunk_size=4, backend=None, strain=True, keep_original_url=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(chunk_size, 1)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(list(specs), backend, strain, keep_original_url))
+
+    def extract_many(self, pages):
+        """Extract (source name, markup, encoding) pages, returning one listing list per page in order"""
+        pages = list(pages)
+        batches = [pages[i:i + self.chunk_size] for i in range(0, len(pages), self.chunk_size)]
+        results = []
+        for batch_results in self.executor.map(_extract_batch, batches):
+            results.extend(batch_results)
+        return results
+
+    def close(self):
+        """Shut the worker processes down"""
+        self.executor.shutdown()
+
+
+def _benchmark_page(num_cards=50, filler=400):
+    """Build a listing page that looks like the real ones: a few cards buried in chrome"""
+    chrome = "".join(
+        f'<li class="nav-item"><a href="/nav/{i}"><span>Menu {i}</span></a>'
+        f'<div class="promo"><p>Sponsored text {i}</p><img src="/img/{i}.png"></div></li>'
+        for i in range(filler)
+    )
+    cards = "".join(
+        f'<div class="job_seen_beacon"><a class="jcs-JobTitle" href="/viewjob?jk={i}">Summer Intern {i}</a>'
+        f'<span class="companyName">Company {i}</span><div class="companyLocation">City {i}</div>'
+        f'<div class="job-snippet">Work on real projects with mentors, number {i}.</div></div>'
+        for i in range(num_cards)
+    )
+    return (f"<html><head><script>var x = {{}};</script><style>.a{{}}</style></head>"
+            f"<body><ul>{chrome}</ul><main>{cards}</main><footer>{chrome}</footer></body></html>")
+
+
+def benchmark(rounds=20):
+    """Compare full-DOM parsing with strained card parsing on every available backend"""
+    page = _benchmark_page()
+    card_class = re.compile('job_')
+    backends = ['html.parser'] + (['lxml'] if DEFAULT_BACKEND == 'lxml' else [])
+
+    results = {}
+    for backend in backends:
+        for strain in (False, True):
+            parser = CardParser('div', card_class, backend=backend, strain=strain)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                cards = parser.parse(page)
+            elapsed = (time.perf_counter() - start) / rounds
+            results[(backend, strain)] = (elapsed, len(cards))
+
+    baseline = results[('html.parser', False)][0]
+    print(f"\n=== Parse time per page ({len(page) // 1024} KB, {rounds} rounds) ===")
+    for (backend, strain), (elapsed, found) in results.items():
+        mode = 'cards only' if strain else 'full DOM'
+        print(f"{backend:12} {mode:10}: {elapsed * 1000:7.2f} ms  ({found} cards, {baseline / elapsed:.1f}x)")
+    print("=" * 30)
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
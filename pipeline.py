@@ -0,0 +1,266 @@
+import asyncio
+import queue
+import threading
+from datetime import datetime
+
+from classify import HITS_KEY
+from httpcache import HttpCache
+from listingstore import ListingStore
+from pagearchive import PageArchive
+from parsecache import ParseCache
+from seenstore import SeenStore, listing_fingerprints
+from snapshot import SnapshotWriter, index_filename
+from textanalysis import TEXT_KEY
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def _put(q, item, stop):
+    """Put an item on a bounded queue, giving up if the pipeline is being stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    """Take the next item off a queue, or _DONE once the pipeline is being stopped"""
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+
+class ListingPipeline:
+    """Streaming fetch -> parse -> dedup -> categorize -> write pipeline
+
+    Stages run in their own threads and are joined by bounded queues, so a
+    slow consumer pushes back on the parsers and fetchers instead of letting
+    pages pile up in memory. Listings come out as soon as their page is parsed.
+    """
+
+    def __init__(self, scraper, page_queue_size=8, listing_queue_size=256, parse_workers=None):
+        self.scraper = scraper
+        self.page_queue_size = page_queue_size
+        self.listing_queue_size = listing_queue_size
+        # With a process pool, keep one feeding thread per worker process busy
+        if parse_workers is None:
+            parse_workers = scraper.parse_pool.workers if scraper.parse_pool else 1
+        self.parse_workers = parse_workers
+
+    @staticmethod
+    def _guard(stage, errors, stop, *args):
+        """Run a stage, and if it fails keep the exception and stop the whole pipeline"""
+        try:
+            stage(*args)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def _fetch_stage(self, plan, pages, stop):
+        """Fetch one source's pages and hand the raw HTML to the parsers"""
+        print(f"Scraping {plan.name}...")
+        for page, response in self.scraper.iter_pages(plan):
+            if stop.is_set():
+                return
+            if response is not None and response.status_code == 200:
+                if not _put(pages, (plan, response), stop):
+                    return
+            elif response is not None:
+                print(f"Failed to retrieve {plan.name} page {page}: {response.status_code}")
+
+    def _parse_stage(self, pages, listings, stop):
+        """Turn pages into listings; each page's tree is dropped as soon as it is extracted"""
+        pool = self.scraper.parse_pool
+        finished = False
+        while not finished:
+            item = _get(pages, stop)
+            if item is _DONE:
+                return
+            batch = [item]
+            # Hand the process pool a chunk of pages at a time; each thread
+            # takes at most one end marker so its siblings still get theirs
+            while pool and len(batch) < pool.chunk_size:
+                try:
+                    item = pages.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                batch.append(item)
+
+            # Pages the parse cache has seen come back without being parsed
+            results = []
+            misses = []
+            for plan, response in batch:
+                fingerprint, page_listings = self.scraper.cached_page(plan, response)
+                if page_listings is None:
+                    misses.append((len(results), plan, fingerprint, response))
+                results.append(page_listings)
+            if pool:
+                parsed = pool.extract_many(
+                    (plan.name, response.content, response.encoding) for _, plan, _, response in misses)
+            else:
+                parsed = [plan.extract(response.text) for _, plan, _, response in misses]
+            for (slot, plan, fingerprint, _), page_listings in zip(misses, parsed):
+                self.scraper.remember_page(plan, fingerprint, page_listings)
+                results[slot] = page_listings
+            batch = misses = parsed = None
+
+            for page_listings in results:
+                for listing in page_listings:
+                    if not _put(listings, listing, stop):
+                        return
+
+    def _close_stages(self, fetchers, parsers, pages, listings, stop):
+        """Signal each stage's end once everything upstream of it has finished"""
+        for thread in fetchers:
+            thread.join()
+        for _ in parsers:
+            _put(pages, _DONE, stop)
+        for thread in parsers:
+            thread.join()
+        _put(listings, _DONE, stop)
+
+    def stream(self, target_count=None):
+        """Yield unique, categorized listings as soon as they are scraped"""
+        scraper = self.scraper
+        stop = threading.Event()
+        pages = queue.Queue(maxsize=self.page_queue_size)
+        listings = queue.Queue(maxsize=self.listing_queue_size)
+
+        scraper.retry_policy.reset_deadlines()
+        scraper.transport.warm_up({plan.origin for plan in scraper.plans.values()})
+
+        # An exception in any stage lands here, stops the others and is re-raised below
+        errors = []
+        fetchers = [threading.Thread(target=self._guard, args=(self._fetch_stage, errors, stop, plan, pages, stop),
+                                     daemon=True)
+                    for plan in scraper.plans.values()]
+        parsers = [threading.Thread(target=self._guard, args=(self._parse_stage, errors, stop, pages, listings, stop),
+                                    daemon=True)
+                   for _ in range(max(self.parse_workers, 1))]
+        closer = threading.Thread(target=self._guard,
+                                  args=(self._close_stages, errors, stop, fetchers, parsers, pages, listings, stop),
+                                  daemon=True)
+        for thread in fetchers + parsers + [closer]:
+            thread.start()
+
+        seen = set()
+        near_duplicates = scraper.near_duplicates = scraper.new_near_duplicate_index()
+        seen_store = scraper.seen_store
+        listing_store = scraper.listing_store
+        yielded = 0
+        skipped = 0
+        try:
+            while target_count is None or yielded < target_count:
+                listing = _get(listings, stop)
+                if errors:
+                    raise errors[0]
+                if listing is _DONE:
+                    break
+                keys = scraper.dedup_keys(listing)
+                if not seen.isdisjoint(keys):
+                    continue
+                seen.update(keys)
+                if near_duplicates is not None and near_duplicates.add(listing)[1] is not None:
+                    continue
+                # Listings processed by an earlier run skip categorizing and writing
+                if seen_store is not None:
+                    fingerprints = listing_fingerprints(listing)
+                    already_seen = any(map(seen_store.seen, fingerprints))
+                    for fingerprint in fingerprints:
+                        seen_store.add(fingerprint)
+                    if already_seen:
+                        # Still live: the store's last_seen moves on without the row being rewritten
+                        if listing_store is not None:
+                            listing_store.touch(listing)
+                        skipped += 1
+                        continue
+                # Rows are written as they stream out, so a later duplicate is
+                # dropped rather than merged in; run_scraper merges them
+                scraper.resolver.start(listing)
+                if not listing.get('category'):
+                    listing['category'] = scraper.categorize(listing)
+                listing.pop(TEXT_KEY, None)
+                listing.pop(HITS_KEY, None)
+                yielded += 1
+                yield listing
+        finally:
+            stop.set()
+            if seen_store is not None:
+                seen_store.flush()
+                print(f"Skipped {skipped} listings already processed in earlier runs")
+            # Unblock any stage still waiting on a full queue
+            for q in (pages, listings):
+                while True:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+            for _ in parsers:
+                try:
+                    pages.put_nowait(_DONE)
+                except queue.Full:
+                    break
+
+    async def astream(self, target_count=None):
+        """Async-iterator version of stream() for use inside an event loop"""
+        listings = self.stream(target_count)
+        done = object()
+        try:
+            while True:
+                listing = await asyncio.to_thread(next, listings, done)
+                if listing is done:
+                    break
+                yield listing
+        finally:
+            listings.close()
+
+    def write_csv(self, filename=None, target_count=None):
+        """Stream listings straight into a CSV file, flushing each row as it arrives"""
+        if not filename:
+            current_date = datetime.now().strftime("%Y-%m-%d")
+            filename = f"high_school_internships_{current_date}.csv"
+
+        listing_store = self.scraper.listing_store
+        count = 0
+        # The category index is built in the same pass as the snapshot
+        with SnapshotWriter(filename, self.scraper.csv_fields, datetime.now().strftime("%Y-%m-%d")) as writer:
+            for listing in self.stream(target_count):
+                writer.write(self.scraper.csv_row(listing))
+                writer.flush()
+                if listing_store is not None:
+                    listing_store.add(listing)
+                count += 1
+        self.scraper.snapshot_index_path = index_filename(filename)
+
+        print(f"Saved {count} internships to {filename}")
+        # Everything streamed this run goes into the store in one transaction
+        if listing_store is not None:
+            listing_store.commit()
+            print(f"Stored {count} internships in {listing_store.path}")
+        return count
+
+
+if __name__ == "__main__":
+    from webScraper import InternshipScraper
+
+    # The daily job only writes listings it hasn't already processed
+    scraper = InternshipScraper(seen_store=SeenStore('seen_listings.db'), listing_store=ListingStore('internships.db'),
+                                http_cache=HttpCache('http_cache.db'), parse_cache=ParseCache('parse_cache.db'),
+                                page_archive=PageArchive('page_archive'))
+    ListingPipeline(scraper).write_csv(target_count=100)
+    scraper.transport.cache.print_stats()
+    scraper.parse_cache.print_stats()
+    scraper.page_archive.print_stats()
+    if scraper.near_duplicates is not None:
+        scraper.near_duplicates.print_report()
+    scraper.close()
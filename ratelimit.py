@@ -0,0 +1,228 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds from now"""
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """Token bucket that allows `burst` back-to-back requests, then `rate` requests per second"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.total_wait = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update, capped at the burst size"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self.total_wait += wait
+            return wait
+
+    def acquire(self):
+        """Block until a token is available and return the time spent waiting"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate):
+        """Change the refill rate without losing the tokens already earned"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease control of one host's concurrency and rate
+
+    Every healthy response nudges the concurrency window and request rate up
+    by a fixed step; a 429/503, an error or a latency spike cuts both by
+    `decrease_factor`. Retry-After pauses the host until the server's deadline.
+    """
+
+    BACKOFF_STATUSES = (429, 503)
+
+    def __init__(self, bucket, max_rate=None, min_rate=None, max_concurrency=4, rate_step=0.05,
+                 concurrency_step=1.0, decrease_factor=0.5, latency_factor=2.0, latency_slack=0.5,
+                 latency_smoothing=0.2):
+        self.bucket = bucket
+        self.max_rate = max_rate if max_rate is not None else bucket.rate
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 10
+        self.max_concurrency = max_concurrency
+        self.rate_step = rate_step
+        self.concurrency_step = concurrency_step
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        # Ignore spikes smaller than this many seconds so normal jitter doesn't count
+        self.latency_slack = latency_slack
+        self.latency_smoothing = latency_smoothing
+
+        self.concurrency = 1.0
+        self.in_flight = 0
+        self.avg_latency = None
+        self.paused_until = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.last_status = None
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the host's concurrent request slots"""
+        with self._cond:
+            while self.in_flight >= max(int(self.concurrency), 1):
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def wait_if_paused(self):
+        """Sleep out any Retry-After pause and return the time spent waiting"""
+        wait = self.paused_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0.0
+
+    def record(self, status, latency, retry_after=None):
+        """Adjust the window and rate from one response (status None means the request failed)"""
+        with self._cond:
+            self.last_status = status
+            latency_spike = (self.avg_latency is not None and latency is not None
+                             and latency > self.avg_latency * self.latency_factor
+                             and latency - self.avg_latency > self.latency_slack)
+
+            if status is None or status in self.BACKOFF_STATUSES or latency_spike:
+                self.concurrency = max(self.concurrency * self.decrease_factor, 1.0)
+                self.bucket.set_rate(max(self.bucket.rate * self.decrease_factor, self.min_rate))
+                self.decreases += 1
+            else:
+                self.concurrency = min(self.concurrency + self.concurrency_step, self.max_concurrency)
+                self.bucket.set_rate(min(self.bucket.rate + self.rate_step, self.max_rate))
+                self.increases += 1
+
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+            if latency is not None and status is not None and status < 400:
+                if self.avg_latency is None:
+                    self.avg_latency = latency
+                else:
+                    self.avg_latency += (latency - self.avg_latency) * self.latency_smoothing
+
+            self._cond.notify_all()
+
+    def state(self):
+        """Return a snapshot of the controller for reporting"""
+        with self._cond:
+            return {
+                'rate': self.bucket.rate,
+                'concurrency': int(self.concurrency),
+                'in_flight': self.in_flight,
+                'avg_latency': self.avg_latency,
+                'paused_for': max(self.paused_until - time.monotonic(), 0.0),
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'last_status': self.last_status,
+            }
+
+
+class HostRateLimiter:
+    """One token bucket per host, so only a host that is out of budget gets delayed"""
+
+    def __init__(self, rate=0.3, burst=2, overrides=None, adaptive=True, max_concurrency=4):
+        self.rate = rate
+        self.burst = burst
+        # host -> (rate, burst) for sites that need a different budget
+        self.overrides = dict(overrides or {})
+        self.adaptive = adaptive
+        self.max_concurrency = max_concurrency
+        self.buckets = {}
+        self.controllers = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, host):
+        """Get (or create) the bucket for a host"""
+        with self._lock:
+            if host not in self.buckets:
+                rate, burst = self.overrides.get(host, (self.rate, self.burst))
+                self.buckets[host] = TokenBucket(rate, burst)
+                if self.adaptive:
+                    self.controllers[host] = AimdController(self.buckets[host], max_concurrency=self.max_concurrency)
+            return self.buckets[host]
+
+    def controller_for(self, host):
+        """Get the AIMD controller for a host, or None when adaptation is off"""
+        self.bucket_for(host)
+        return self.controllers.get(host)
+
+    def acquire(self, host):
+        """Wait for the host's budget (and any Retry-After pause) and return the time spent waiting"""
+        waited = 0.0
+        controller = self.controller_for(host)
+        if controller:
+            waited += controller.wait_if_paused()
+        return waited + self.bucket_for(host).acquire()
+
+    @contextmanager
+    def slot(self, host):
+        """Hold a concurrent request slot for a host"""
+        controller = self.controller_for(host)
+        if controller is None:
+            yield
+            return
+        with controller.slot():
+            yield
+
+    def record(self, host, status, latency, retry_after=None):
+        """Feed a response outcome back to the host's controller"""
+        controller = self.controller_for(host)
+        if controller:
+            controller.record(status, latency, retry_after)
+
+    def stats(self):
+        """Return the current rate, waiting time and controller state for each host"""
+        with self._lock:
+            buckets = list(self.buckets.items())
+            controllers = dict(self.controllers)
+
+        stats = {}
+        for host, bucket in buckets:
+            stats[host] = {'rate': bucket.rate, 'burst': bucket.burst, 'waited': bucket.total_wait}
+            if host in controllers:
+                stats[host].update(controllers[host].state())
+        return stats
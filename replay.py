@@ -0,0 +1,202 @@
+import base64
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers describing the wire encoding of a body; recorded bodies are stored decoded
+WIRE_HEADERS = ('Content-Encoding', 'Transfer-Encoding', 'Content-Length')
+
+
+def load_bundle(path):
+    """Recorded exchanges of a fixture bundle, in the order they were recorded"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def save_bundle(path, exchanges):
+    """Write exchanges to a fixture bundle (gzipped JSON lines)"""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for exchange in exchanges:
+            f.write(json.dumps(exchange) + "\n")
+
+
+class _RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that hands every response it receives to a FixtureRecorder"""
+
+    def __init__(self, recorder, **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    def send(self, request, **kwargs):
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        # Read the body here so its download time counts towards the recorded latency
+        body = response.content
+        self.recorder.record(request, response, body, time.monotonic() - start)
+        return response
+
+
+class FixtureRecorder:
+    """Records every request/response pair made through the transport into a fixture bundle
+
+    Pass it as HttpTransport's (or InternshipScraper's) adapter_factory: each
+    host still gets a real pooled HTTPAdapter, which also writes what it
+    sent and received down. save() writes the bundle.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.exchanges = []
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        return _RecordingAdapter(self, **kwargs)
+
+    def record(self, request, response, body, elapsed):
+        """Keep one exchange"""
+        exchange = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items() if name not in WIRE_HEADERS},
+            'body': base64.b64encode(body or b'').decode('ascii'),
+            'elapsed': elapsed,
+        }
+        with self._lock:
+            self.exchanges.append(exchange)
+
+    def save(self):
+        """Write everything recorded so far to the bundle and return the number of exchanges"""
+        with self._lock:
+            exchanges = list(self.exchanges)
+        save_bundle(self.path, exchanges)
+        return len(exchanges)
+
+
+class _ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests from a FixtureReplayer instead of the network"""
+
+    def __init__(self, replayer):
+        super().__init__()
+        self.replayer = replayer
+
+    def send(self, request, **kwargs):
+        return self.replayer.respond(request, self)
+
+    def close(self):
+        pass
+
+
+class FixtureReplayer:
+    """Serves a recorded fixture bundle back through the transport, fully offline
+
+    Pass it as adapter_factory in place of a FixtureRecorder. The n-th request
+    for a method and URL gets the n-th response recorded for it (the last one
+    once they run out), so retries after a recorded 429 replay exactly as they
+    happened. A request that was never recorded fails like a connection error.
+    Each response waits for `latency` seconds first: None replays the
+    recorded time, a number is used as is and a callable gets the request.
+    `jitter` adds up to that fraction either way, from a seeded generator.
+    Rate limiting, retries and every stage above the transport run as usual.
+    """
+
+    def __init__(self, path, latency=None, jitter=0.0, seed=0):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.responses = defaultdict(list)
+        for exchange in load_bundle(path):
+            self.responses[(exchange['method'], exchange['url'])].append(exchange)
+        self.served = defaultdict(int)
+        self.missing = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        return _ReplayAdapter(self)
+
+    def _delay(self, request, exchange):
+        """Seconds to hold a response back for"""
+        if self.latency is None:
+            delay = exchange['elapsed']
+        elif callable(self.latency):
+            delay = self.latency(request)
+        else:
+            delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+
+    def respond(self, request, adapter):
+        """The recorded response for a request, after the injected latency"""
+        key = (request.method, request.url)
+        with self._lock:
+            recorded = self.responses.get(key)
+            if not recorded:
+                self.missing += 1
+            else:
+                exchange = recorded[min(self.served[key], len(recorded) - 1)]
+                self.served[key] += 1
+        if not recorded:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}",
+                                           request=request)
+
+        delay = self._delay(request, exchange)
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.reason = exchange['reason']
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        response._content = base64.b64decode(exchange['body'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def print_stats(self):
+        """Print how many requests were replayed and how many had no recording"""
+        print("\n=== Replay ===")
+        print(f"{sum(self.served.values())} responses replayed from {self.path}, "
+              f"{self.missing} requests not in the bundle")
+        print("=" * 30)
+
+
+if __name__ == "__main__":
+    # python replay.py record <bundle>            - crawl the live sites and record every exchange
+    # python replay.py replay <bundle> [latency]  - rerun the crawl offline from the bundle
+    from webScraper import InternshipScraper
+
+    mode, path = sys.argv[1], sys.argv[2]
+    if mode == 'record':
+        adapter_factory = FixtureRecorder(path)
+    else:
+        adapter_factory = FixtureReplayer(path, latency=float(sys.argv[3]) if len(sys.argv) > 3 else None)
+
+    scraper = InternshipScraper(adapter_factory=adapter_factory)
+    start = time.perf_counter()
+    internships = scraper.run_scraper(target_count=100)
+    elapsed = time.perf_counter() - start
+    print(f"\nFound {len(internships)} internships in {elapsed:.1f} s")
+    scraper.transport.print_stats()
+    scraper.print_crawl_state()
+
+    if mode == 'record':
+        print(f"Recorded {adapter_factory.save()} exchanges to {path}")
+    else:
+        adapter_factory.print_stats()
+    scraper.close()
@@ -0,0 +1,79 @@
+from collections import Counter
+
+from sites import PLACEHOLDERS
+
+# Fields filled in from whichever duplicate has the best value
+MERGED_FIELDS = ('company', 'location', 'description', 'url')
+
+
+def is_placeholder(value):
+    """Whether a field value is missing or only stands in for missing data"""
+    return not value or value in PLACEHOLDERS
+
+
+def better_value(field, current, candidate):
+    """The better of two values for a field
+
+    Anything real beats a placeholder and a longer description beats a
+    shorter one; otherwise the current value stays.
+    """
+    if is_placeholder(candidate):
+        return current
+    if is_placeholder(current):
+        return candidate
+    if field == 'description' and len(candidate) > len(current):
+        return candidate
+    return current
+
+
+class EntityResolver:
+    """Merges duplicate listings from different sources into one enriched record
+
+    The first listing seen (sources are scraped in priority order) becomes the
+    record and keeps its title and primary source. Every field in
+    MERGED_FIELDS takes the best value any duplicate has, so a LinkedIn
+    "See link for details" picks up Indeed's real snippet, and the record
+    lists every source and URL the listing was found under.
+    """
+
+    def __init__(self):
+        self.merged = 0
+        self.filled = Counter()
+
+    def start(self, listing):
+        """Make a listing the record later duplicates are merged into"""
+        listing['sources'] = list(listing.get('sources') or [listing['source']])
+        listing['urls'] = list(listing.get('urls') or [listing['url']])
+        return listing
+
+    def merge(self, record, duplicate):
+        """Fold a duplicate into a record in place"""
+        for field in MERGED_FIELDS:
+            current = record.get(field)
+            value = better_value(field, current, duplicate.get(field))
+            if value is not current:
+                if is_placeholder(current):
+                    self.filled[field] += 1
+                record[field] = value
+                # A category worked out from the old description no longer holds
+                if field == 'description' and record.get('category'):
+                    record['category'] = None
+
+        for source in duplicate.get('sources') or [duplicate['source']]:
+            if source not in record['sources']:
+                record['sources'].append(source)
+        urls = record['urls'] + [url for url in duplicate.get('urls') or [duplicate['url']]
+                                 if url not in record['urls']]
+        # A placeholder is only worth listing while there is no real link
+        record['urls'] = [url for url in urls if not is_placeholder(url)] or [record['url']]
+        self.merged += 1
+        return record
+
+    def print_report(self):
+        """Print how many duplicates were merged and which fields they filled in"""
+        print("\n=== Merged Duplicates ===")
+        print(f"Duplicates merged: {self.merged}")
+        for field in MERGED_FIELDS:
+            if self.filled[field]:
+                print(f"Filled in {field}: {self.filled[field]}")
+        print("=" * 30)
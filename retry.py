@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+
+import requests
+
+
+class DeadlineExceeded(requests.RequestException):
+    """Raised when a source has used up its overall time budget"""
+
+
+class RetryPolicy:
+    """Timeouts, bounded jittered retries and a per-host deadline for every fetch"""
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, connect_timeout=5, read_timeout=20, max_retries=3, backoff_base=1.0,
+                 backoff_max=30.0, source_deadline=300, history_size=1000):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Seconds a single source may spend on all of its requests in one run
+        self.source_deadline = source_deadline
+        self.deadlines = {}
+        self.attempts = deque(maxlen=history_size)
+        self.outcomes = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def reset_deadlines(self):
+        """Start a new run so every source gets a fresh time budget"""
+        with self._lock:
+            self.deadlines = {}
+
+    def time_left(self, host):
+        """Seconds remaining in the host's budget (starting the clock on first use)"""
+        if not self.source_deadline:
+            return float('inf')
+        with self._lock:
+            if host not in self.deadlines:
+                self.deadlines[host] = time.monotonic() + self.source_deadline
+            return self.deadlines[host] - time.monotonic()
+
+    def should_retry(self, attempt, status=None, error=None):
+        """Whether a failed attempt is worth repeating"""
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return status in self.RETRY_STATUSES
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay before the next attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def record(self, host, url, attempt, status=None, error=None, elapsed=0.0, waited=0.0):
+        """Remember the outcome of one attempt, its request time and the time it waited to be sent"""
+        if error is not None:
+            outcome = 'timeout' if isinstance(error, requests.Timeout) else 'error'
+        elif status in self.RETRY_STATUSES:
+            outcome = f'http_{status}'
+        else:
+            outcome = 'ok'
+
+        with self._lock:
+            self.attempts.append({
+                'host': host,
+                'url': url,
+                'attempt': attempt,
+                'status': status,
+                'outcome': outcome,
+                'error': str(error) if error is not None else None,
+                'elapsed': elapsed,
+                'waited': waited,
+            })
+            self.outcomes[(host, outcome)] += 1
+            if attempt > 0:
+                self.outcomes[(host, 'retries')] += 1
+
+    def stats(self):
+        """Return per-host attempt outcome counts"""
+        stats = {}
+        with self._lock:
+            for (host, outcome), count in self.outcomes.items():
+                stats.setdefault(host, {})[outcome] = count
+        return stats
@@ -0,0 +1,203 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+from textanalysis import field_text
+from urls import listing_url
+
+
+def listing_fingerprint(listing):
+    """16-byte fingerprint identifying a listing across runs by title and company"""
+    # Normalized text, so cosmetic differences don't change a fingerprint
+    key = "\x1f".join(field_text(listing, field).normalized for field in ('title', 'company'))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+def listing_fingerprints(listing):
+    """Every fingerprint a listing is known by: title and company, plus each canonical URL it has
+
+    A listing counts as seen when any of them was seen. Merged records carry
+    the URLs of every duplicate folded into them.
+    """
+    fingerprints = [listing_fingerprint(listing)]
+    urls = [listing_url(listing)] + [url for url in listing.get('urls', ()) if url != listing.get('url')]
+    for url in urls:
+        if url and url.startswith(('http://', 'https://')):
+            fingerprints.append(hashlib.blake2b(("url\x1f" + url).encode('utf-8'), digest_size=16).digest())
+    return fingerprints
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte fingerprints"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint):
+        """Bit positions for a fingerprint, by double hashing its two 64-bit halves"""
+        h1 = int.from_bytes(fingerprint[:8], 'little')
+        h2 = int.from_bytes(fingerprint[8:16], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, fingerprint):
+        """Set the fingerprint's bits"""
+        for pos in self._positions(fingerprint):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, fingerprint):
+        """False means definitely never added; True means probably added"""
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+
+class SeenStore:
+    """On-disk record of listing fingerprints already processed, with a Bloom filter in front
+
+    Fingerprints live in SQLite, so millions of them cost disk rather than
+    RAM. The Bloom filter answers "never seen" without touching the disk,
+    which is the common case for new listings. An entry expires once it
+    hasn't been seen for `ttl_days`.
+    """
+
+    def __init__(self, path='seen_listings.db', ttl_days=30, capacity=5_000_000, error_rate=0.01, batch_size=500):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.batch_size = batch_size
+        self.pending = {}
+        self.bloom_hits = 0
+        self.bloom_misses = 0
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                fingerprint BLOB PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen)")
+        # Bloom filter saved by close(), so a clean restart doesn't have to rebuild it
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS bloom (
+                id INTEGER PRIMARY KEY,
+                capacity INTEGER,
+                error_rate REAL,
+                bits BLOB
+            )
+        """)
+        self.conn.commit()
+
+        # Always load (and so drop) the saved filter first, even when expiry
+        # forces a rebuild, so a crash before close() can't leave it behind
+        loaded = self._load_bloom()
+        removed = self._expire_rows()
+        if removed or not loaded:
+            self._rebuild_bloom()
+
+    def _expire_rows(self):
+        """Delete fingerprints last seen before the TTL and return how many were removed"""
+        if not self.ttl:
+            return 0
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM seen WHERE last_seen < ?", (time.time() - self.ttl,))
+        return cursor.rowcount
+
+    def _load_bloom(self):
+        """Load the Bloom filter saved by the last clean close, if it still matches"""
+        row = self.conn.execute("SELECT capacity, error_rate, bits FROM bloom WHERE id = 1").fetchone()
+        # Drop it right away: if this process dies before close(), the saved
+        # bits would be missing everything added since and must not be reused
+        with self.conn:
+            self.conn.execute("DELETE FROM bloom")
+        if row is None or row[0] != self.capacity or row[1] != self.error_rate:
+            return False
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        if len(row[2]) != len(self.bloom.bits):
+            return False
+        self.bloom.bits = bytearray(row[2])
+        return True
+
+    def _save_bloom(self):
+        """Persist the Bloom filter for the next run"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO bloom (id, capacity, error_rate, bits) VALUES (1, ?, ?, ?)",
+                              (self.capacity, self.error_rate, bytes(self.bloom.bits)))
+
+    def _rebuild_bloom(self):
+        """Load every stored fingerprint into a fresh Bloom filter"""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        for (fingerprint,) in self.conn.execute("SELECT fingerprint FROM seen"):
+            self.bloom.add(fingerprint)
+
+    def expire(self):
+        """Drop fingerprints not seen within the TTL and return how many were removed"""
+        with self._lock:
+            self._flush()
+            removed = self._expire_rows()
+            if removed:
+                self._rebuild_bloom()
+            return removed
+
+    def seen(self, fingerprint):
+        """Whether a fingerprint was processed within the TTL"""
+        with self._lock:
+            if fingerprint not in self.bloom:
+                self.bloom_misses += 1
+                return False
+            self.bloom_hits += 1
+            if fingerprint in self.pending:
+                return True
+            row = self.conn.execute("SELECT last_seen FROM seen WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            return row is not None and (not self.ttl or row[0] >= time.time() - self.ttl)
+
+    def add(self, fingerprint):
+        """Record a fingerprint as processed (or refresh its last-seen time)"""
+        with self._lock:
+            self.bloom.add(fingerprint)
+            self.pending[fingerprint] = time.time()
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def check_and_add(self, fingerprint):
+        """Return whether a fingerprint was already seen, and record this sighting either way"""
+        already_seen = self.seen(fingerprint)
+        self.add(fingerprint)
+        return already_seen
+
+    def _flush(self):
+        """Write buffered sightings in one transaction"""
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO seen (fingerprint, first_seen, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET last_seen = excluded.last_seen
+            """, [(fp, ts, ts) for fp, ts in self.pending.items()])
+        self.pending = {}
+
+    def flush(self):
+        """Write buffered sightings now"""
+        with self._lock:
+            self._flush()
+
+    def __len__(self):
+        """Number of fingerprints on disk"""
+        with self._lock:
+            self._flush()
+            return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        """Write any buffered sightings, save the Bloom filter and close the database"""
+        with self._lock:
+            self._flush()
+            self._save_bloom()
+            self.conn.close()
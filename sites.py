@@ -0,0 +1,138 @@
+import re
+
+# Values used when a card doesn't have a field
+FIELD_DEFAULTS = {
+    'company': "Not specified",
+    'location': "Not specified",
+    'description': "No description available",
+    'url': "No link available",
+}
+
+# Field values that stand in for missing data rather than describing the listing
+PLACEHOLDERS = set(FIELD_DEFAULTS.values()) | {"See link for details"}
+
+# One entry per source site, in priority order. Each spec says:
+#   url          page URL template; {page} is first_page + index * page_step
+#   pages        how many pages a normal run fetches
+#   card         (tag, class) of the element wrapping one listing
+#   fields       field name -> (tag, class) inside the card; class may be a
+#                regex or None for "any element with that tag"
+#   link         field whose href is the listing URL, and base_url to prefix it with
+#   url_params   query parameters that identify a listing; everything else is
+#                dropped from the canonical URL (default: drop tracking params)
+#   url_host     host to use in canonical URLs when a site answers on several domains
+#   fixed        field values that are the same for every listing of the source
+#   require      lowercase text some word of the title must contain, or None to keep everything
+SITE_SPECS = [
+    {
+        'name': 'Indeed',
+        'url': "https://www.indeed.com/jobs?q=summer+internship+high+school&start={page}",
+        'first_page': 0,
+        'page_step': 10,
+        'pages': 8,
+        'card': ('div', re.compile('job_')),
+        'fields': {
+            'title': ('a', re.compile('jcs-JobTitle')),
+            'company': ('span', 'companyName'),
+            'location': ('div', 'companyLocation'),
+            'description': ('div', 'job-snippet'),
+        },
+        'link': 'title',
+        'base_url': "https://www.indeed.com",
+        'url_params': ['jk'],
+        'require': 'intern',
+    },
+    {
+        'name': 'LinkedIn',
+        'url': "https://www.linkedin.com/jobs/search/?keywords=summer%20internship%20high%20school&start={page}",
+        'first_page': 0,
+        'page_step': 25,
+        'pages': 8,
+        'card': ('div', 'base-card'),
+        'fields': {
+            'title': ('h3', 'base-search-card__title'),
+            'company': ('h4', 'base-search-card__subtitle'),
+            'location': ('span', 'job-search-card__location'),
+            'link': ('a', 'base-card__full-link'),
+        },
+        'link': 'link',
+        'url_params': [],
+        'url_host': "www.linkedin.com",
+        'fixed': {'description': "See link for details"},
+        'require': 'intern',
+    },
+    {
+        'name': 'Chegg Internships',
+        'url': "https://www.internships.com/high-school?page={page}",
+        'pages': 4,
+        'card': ('div', 'internship-row'),
+        'fields': {
+            'title': ('h2', 'internship-title'),
+            'company': ('div', 'company-name'),
+            'location': ('span', 'location'),
+            'description': ('div', 'description'),
+            'link': ('a', 'title-link'),
+        },
+        'link': 'link',
+        'base_url': "https://www.internships.com",
+    },
+    {
+        'name': 'WayUp',
+        'url': "https://www.wayup.com/s/internships/high-school/{page}/",
+        'pages': 4,
+        'card': ('div', 'job-card'),
+        'fields': {
+            'title': ('h2', 'job-title'),
+            'company': ('div', 'company-name'),
+            'location': ('div', 'job-location'),
+            'link': ('a', 'job-link'),
+        },
+        'link': 'link',
+        'base_url': "https://www.wayup.com",
+        'fixed': {'description': "See link for details"},
+        'require': 'intern',
+    },
+    {
+        'name': 'Lumiere',
+        'url': "https://www.lumiereducation.com/programs/page/{page}/?category=internships",
+        'pages': 3,
+        'card': ('div', 'program-card'),
+        'fields': {
+            'title': ('h3', 'program-title'),
+            'description': ('div', 'program-details'),
+            'link': ('a', None),
+        },
+        'link': 'link',
+        'fixed': {'company': "Lumiere Education", 'location': "Various/Remote"},
+        'defaults': {'description': "See link for details"},
+        'require': 'intern',
+    },
+    {
+        'name': 'FindECs',
+        'url': "https://www.findecs.org/opportunities/page/{page}/?type=internship",
+        'pages': 3,
+        'card': ('div', 'opportunity-card'),
+        'fields': {
+            'title': ('h2', 'opportunity-title'),
+            'company': ('div', 'organization'),
+            'location': ('div', 'location'),
+            'link': ('a', 'opportunity-link'),
+        },
+        'link': 'link',
+        'fixed': {'description': "See link for details"},
+    },
+    {
+        'name': 'InternshipFinder',
+        'url': "https://www.internshipfinder.com/high-school-internships/?page={page}",
+        'pages': 3,
+        'card': ('div', 'listing-card'),
+        'fields': {
+            'title': ('h3', 'listing-title'),
+            'company': ('div', 'company-name'),
+            'location': ('div', 'location'),
+            'description': ('div', 'description-preview'),
+            'link': ('a', 'listing-link'),
+        },
+        'link': 'link',
+    },
+]
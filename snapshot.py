@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+import os
+import sys
+
+
+def category_filename(category, date):
+    """File name a category view is materialized under"""
+    return f"internships_{category.lower().replace(' & ', '_').replace(' ', '_')}_{date}.csv"
+
+
+def index_filename(snapshot):
+    """Where the category index of a snapshot CSV lives"""
+    root, _ = os.path.splitext(snapshot)
+    return f"{root}.index.json"
+
+
+class SnapshotWriter:
+    """Writes the canonical snapshot CSV and its per-category row index in one pass
+
+    Every row is serialized once, into the snapshot; the index only records
+    the byte offset and length of each category's rows, so category files
+    never duplicate the data on disk and can be materialized later with
+    plain byte copies.
+    """
+
+    def __init__(self, filename, fields, date, group_field='category'):
+        self.filename = filename
+        self.fields = list(fields)
+        self.date = date
+        self.group_field = group_field
+        self.groups = {}
+        self.count = 0
+
+        self.buffer = io.StringIO()
+        self.writer = csv.DictWriter(self.buffer, fieldnames=self.fields)
+        self.file = open(filename, 'wb')
+        self.writer.writeheader()
+        self.position = self.file.write(self._take())
+
+    def _take(self):
+        """Encoded bytes of whatever the csv writer has produced since the last call"""
+        data = self.buffer.getvalue().encode('utf-8')
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def write(self, row):
+        """Append one row to the snapshot and index it under its group"""
+        self.writer.writerow(row)
+        data = self._take()
+        self.groups.setdefault(row.get(self.group_field) or '', []).extend((self.position, len(data)))
+        self.position += self.file.write(data)
+        self.count += 1
+
+    def flush(self):
+        """Push written rows to disk"""
+        self.file.flush()
+
+    def close(self):
+        """Finish the snapshot and write its index next to it"""
+        self.file.close()
+        index = {
+            'snapshot': os.path.basename(self.filename),
+            'date': self.date,
+            'fields': self.fields,
+            'group_field': self.group_field,
+            'groups': self.groups,
+        }
+        with open(index_filename(self.filename), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SnapshotIndex:
+    """Category views over a snapshot CSV, read through its index"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            index = json.load(f)
+        self.snapshot = os.path.join(os.path.dirname(path), index['snapshot'])
+        self.date = index['date']
+        self.fields = index['fields']
+        self.groups = index['groups']
+
+    @property
+    def categories(self):
+        """Categories with at least one row, in the order they first appeared"""
+        return list(self.groups)
+
+    def count(self, category):
+        """Number of rows in a category"""
+        return len(self.groups.get(category, ())) // 2
+
+    def iter_raw(self, category):
+        """Yield a category's rows as the raw CSV bytes stored in the snapshot"""
+        spans = self.groups.get(category, [])
+        with open(self.snapshot, 'rb') as f:
+            for i in range(0, len(spans), 2):
+                f.seek(spans[i])
+                yield f.read(spans[i + 1])
+
+    def iter_rows(self, category):
+        """Yield a category's rows as dicts, reading only those rows from the snapshot"""
+        for data in self.iter_raw(category):
+            for values in csv.reader(io.StringIO(data.decode('utf-8'), newline='')):
+                yield dict(zip(self.fields, values))
+
+    def materialize(self, category, filename=None):
+        """Write a category's rows out as a standalone CSV file and return its name"""
+        if filename is None:
+            filename = os.path.join(os.path.dirname(self.snapshot), category_filename(category, self.date))
+        with open(self.snapshot, 'rb') as snapshot:
+            header = snapshot.readline()
+        with open(filename, 'wb') as f:
+            f.write(header)
+            for data in self.iter_raw(category):
+                f.write(data)
+        return filename
+
+
+if __name__ == "__main__":
+    # python snapshot.py <index.json> [category] - list categories, or materialize one
+    snapshot_index = SnapshotIndex(sys.argv[1])
+    if len(sys.argv) < 3:
+        for name in snapshot_index.categories:
+            print(f"{name}: {snapshot_index.count(name)} internships")
+    else:
+        print(f"Saved {snapshot_index.count(sys.argv[2])} {sys.argv[2]} internships to "
+              f"{snapshot_index.materialize(sys.argv[2])}")
@@ -0,0 +1,218 @@
+import csv
+import hashlib
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import Counter
+from operator import itemgetter
+
+from listingstore import listing_key
+
+# Fields that change between scrapes without the listing itself changing
+VOLATILE_FIELDS = ('original_url',)
+# (key hash, content hash, byte offset of the row) as stored in the partition files
+_RECORD = struct.Struct('<QQQ')
+# Rough snapshot bytes per partition; each partition of the old snapshot is held in memory on its own
+PARTITION_BYTES = 64 * 1024 * 1024
+
+
+def _hash(text):
+    """64-bit hash of a string"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def iter_records(path):
+    """Yield (byte offset, raw bytes) for every data row of a CSV file, header excluded
+
+    A row ends at a line break outside quotes, so quoted fields may contain newlines.
+    """
+    with open(path, 'rb') as f:
+        record = b''
+        offset = position = 0
+        for line in f:
+            if not record:
+                offset = position
+            record += line
+            position += len(line)
+            if record.count(b'"') % 2 == 0:
+                if offset:
+                    yield offset, record
+                record = b''
+
+
+def parse_record(data):
+    """Field values of one raw CSV row"""
+    return next(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+
+
+def read_header(path):
+    """Column names of a CSV file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f))
+
+
+def read_row(f, fields, offset):
+    """The row starting at a byte offset of an open binary CSV file, as a dict"""
+    f.seek(offset)
+    record = f.readline()
+    while record.count(b'"') % 2:
+        record += f.readline()
+    return dict(zip(fields, parse_record(record)))
+
+
+class SnapshotDiff:
+    """Streams the differences between two snapshot CSVs
+
+    Rows are joined on their canonical key (the same one the listing store
+    uses) and compared by a hash of their content, ignoring VOLATILE_FIELDS.
+    Only columns both snapshots have are compared, so a column added or
+    dropped between them doesn't make every row look changed.
+    Both snapshots are first split by key hash into partition files of
+    24-byte (key hash, content hash, offset) records; then one old partition
+    at a time is loaded into a hash table and the matching new partition is
+    streamed against it. Memory is bounded by the largest partition, not by
+    the size of either snapshot. Changes come out partition by partition,
+    each as (change, old row, new row) with change one of 'new', 'changed'
+    or 'removed'; full rows are read back from the snapshots by offset only
+    for rows that actually changed.
+    """
+
+    def __init__(self, old_path, new_path, partitions=None):
+        self.old_path = old_path
+        self.new_path = new_path
+        if partitions is None:
+            size = max(os.path.getsize(old_path), os.path.getsize(new_path))
+            partitions = size // PARTITION_BYTES + 1
+        self.partitions = partitions
+        self.old_fields = read_header(old_path)
+        self.new_fields = read_header(new_path)
+        self.content_fields = [field for field in self.old_fields
+                               if field in self.new_fields and field not in VOLATILE_FIELDS]
+        if not self.content_fields:
+            raise ValueError(f"{old_path} and {new_path} have no columns in common to compare")
+        self.counts = Counter()
+
+    def _partition(self, path, fields, directory, prefix):
+        """Split a snapshot into partition files of packed records by key hash"""
+        # The same columns in the same order for both snapshots
+        content = itemgetter(*[fields.index(field) for field in self.content_fields])
+        if len(self.content_fields) == 1:
+            column = content
+            content = lambda values: (column(values),)
+        offsets = []
+
+        def records():
+            for offset, data in iter_records(path):
+                offsets.append(offset)
+                yield data.decode('utf-8')
+
+        files = [open(os.path.join(directory, f"{prefix}{i}"), 'wb') for i in range(self.partitions)]
+        try:
+            # One reader over the whole file; each record it is fed is exactly one row
+            for values in csv.reader(records()):
+                values += [''] * (len(fields) - len(values))
+                key = _hash(listing_key(dict(zip(fields, values))))
+                files[key % self.partitions].write(
+                    _RECORD.pack(key, _hash("\x1f".join(content(values))), offsets.pop()))
+        finally:
+            for f in files:
+                f.close()
+
+    @staticmethod
+    def _read_partition(path):
+        """Yield the packed records of a partition file"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        return _RECORD.iter_unpack(data)
+
+    def __iter__(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                open(self.old_path, 'rb') as old_file, open(self.new_path, 'rb') as new_file:
+            self._partition(self.old_path, self.old_fields, directory, 'old')
+            self._partition(self.new_path, self.new_fields, directory, 'new')
+
+            for i in range(self.partitions):
+                old = {key: (content, offset)
+                       for key, content, offset in self._read_partition(os.path.join(directory, f"old{i}"))}
+                for key, content, offset in self._read_partition(os.path.join(directory, f"new{i}")):
+                    match = old.pop(key, None)
+                    if match is None:
+                        self.counts['new'] += 1
+                        yield 'new', None, read_row(new_file, self.new_fields, offset)
+                    elif match[0] != content:
+                        self.counts['changed'] += 1
+                        yield ('changed', read_row(old_file, self.old_fields, match[1]),
+                               read_row(new_file, self.new_fields, offset))
+                    else:
+                        self.counts['unchanged'] += 1
+                for content, offset in old.values():
+                    self.counts['removed'] += 1
+                    yield 'removed', read_row(old_file, self.old_fields, offset), None
+
+    def write_csv(self, filename):
+        """Write every change to a CSV with a leading 'change' column and return the number written"""
+        fields = ['change'] + self.new_fields
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for change, old_row, new_row in self:
+                writer.writerow(dict(new_row or old_row, change=change))
+                count += 1
+        return count
+
+    def print_report(self):
+        """Print how many listings were new, changed, removed and unchanged"""
+        print("\n=== Snapshot Diff ===")
+        print(f"{self.old_path} -> {self.new_path}")
+        ignored = sorted(set(self.old_fields).symmetric_difference(self.new_fields) - set(VOLATILE_FIELDS))
+        if ignored:
+            print(f"Not compared (only in one snapshot): {', '.join(ignored)}")
+        for change in ('new', 'changed', 'removed', 'unchanged'):
+            print(f"{change.capitalize()}: {self.counts[change]}")
+        print("=" * 30)
+
+
+def benchmark(count=1_000_000, partitions=8):
+    """Diff two synthetic snapshots of `count` rows with 1% of rows new, changed and removed"""
+    fields = ['title', 'company', 'location', 'description', 'url', 'source', 'category']
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, name) for name in ('old.csv', 'new.csv')]
+        for version, path in enumerate(paths):
+            with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fields)
+                for i in range(version * count // 100, count + version * count // 100):
+                    description = "Updated,\nsee link" if version and i % 100 == 1 else "See link for details"
+                    writer.writerow([f"Intern #{i}", f"Company {i % 5000}", "Remote", description,
+                                     f"https://example.com/jobs/{i}", "Indeed", "Technology"])
+
+        start = time.perf_counter()
+        snapshot_diff = SnapshotDiff(paths[0], paths[1], partitions)
+        changes = sum(1 for _ in snapshot_diff)
+        elapsed = time.perf_counter() - start
+
+    print(f"\n=== Snapshot Diff over {count:,} rows ({partitions} partitions) ===")
+    print(f"{changes:,} changes in {elapsed:.1f} s ({count / elapsed:,.0f} rows/s per snapshot)")
+    for change in ('new', 'changed', 'removed', 'unchanged'):
+        print(f"{change.capitalize()}: {snapshot_diff.counts[change]:,}")
+    print("=" * 30)
+    return elapsed
+
+
+if __name__ == "__main__":
+    # python snapshotdiff.py <old.csv> <new.csv> [changes.csv]
+    if len(sys.argv) < 3:
+        benchmark()
+        sys.exit()
+    snapshot_diff = SnapshotDiff(sys.argv[1], sys.argv[2])
+    if len(sys.argv) > 3:
+        print(f"Saved {snapshot_diff.write_csv(sys.argv[3])} changes to {sys.argv[3]}")
+    else:
+        for change, old_row, new_row in snapshot_diff:
+            row = new_row or old_row
+            print(f"{change}: {row['title']} at {row['company']}")
+    snapshot_diff.print_report()
@@ -0,0 +1,251 @@
+import random
+import time
+from array import array
+from collections import Counter
+from itertools import compress
+
+from listing import Listing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Narrowest array typecode that can hold a dictionary code, and its NumPy dtype
+_CODE_TYPES = [('B', 0xFF, 'uint8'), ('H', 0xFFFF, 'uint16'), ('I', 0xFFFFFFFF, 'uint32')]
+_DTYPES = {typecode: dtype for typecode, _, dtype in _CODE_TYPES}
+
+CATEGORICAL_COLUMNS = ('company', 'location', 'source', 'category')
+TEXT_COLUMNS = ('title', 'description', 'url')
+
+
+def _and(first, second):
+    """Element-wise AND of two masks"""
+    if np is not None:
+        return first & second
+    size = len(first)
+    return (int.from_bytes(first, 'little') & int.from_bytes(second, 'little')).to_bytes(size, 'little')
+
+
+class DictColumn:
+    """Categorical column stored as integer codes into a dictionary of its distinct values
+
+    Codes use the narrowest array type that fits (one byte per row while a
+    column has at most 256 distinct values). Filters and counts work on the
+    codes: with NumPy through isin/bincount, otherwise with bytes.translate
+    and Counter, both of which run in C.
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes_by_value = {}
+        self.codes = array('B')
+        self._np_codes = None
+        self.extend(values)
+
+    def encode(self, value):
+        """Code for a value, adding it to the dictionary if it is new"""
+        code = self.codes_by_value.get(value)
+        if code is None:
+            code = self.codes_by_value[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def _widen(self):
+        """Switch to a wider code type once the dictionary outgrows the current one"""
+        for typecode, limit, _ in _CODE_TYPES:
+            if len(self.values) - 1 <= limit:
+                break
+        if typecode != self.codes.typecode:
+            self.codes = array(typecode, self.codes)
+
+    def append(self, value):
+        """Add one row"""
+        self.extend([value])
+
+    def extend(self, values):
+        """Add rows"""
+        codes = list(map(self.encode, values))
+        self._widen()
+        self.codes.extend(codes)
+        self._np_codes = None
+
+    def np_codes(self):
+        """The codes as a NumPy array, cached until the column changes"""
+        if self._np_codes is None:
+            # Copied, so the array('B') buffer can still grow afterwards
+            self._np_codes = np.frombuffer(self.codes, dtype=_DTYPES[self.codes.typecode]).copy()
+        return self._np_codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def mask(self, wanted):
+        """Mask of the rows whose value is one of `wanted`"""
+        codes = [self.codes_by_value[value] for value in wanted if value in self.codes_by_value]
+        if np is not None:
+            return np.isin(self.np_codes(), codes)
+        if self.codes.typecode == 'B':
+            table = bytearray(256)
+            for code in codes:
+                table[code] = 1
+            return self.codes.tobytes().translate(table)
+        return bytes(map(set(codes).__contains__, self.codes))
+
+    def counts(self, mask=None):
+        """Counter of value -> number of rows, optionally only over masked rows"""
+        if np is not None:
+            codes = self.np_codes() if mask is None else self.np_codes()[mask]
+            totals = np.bincount(codes, minlength=len(self.values))
+            counted = ((code, int(n)) for code, n in enumerate(totals))
+        elif self.codes.typecode == 'B' and len(self.values) <= 32:
+            # A handful of bytes.count passes beats one Python-level Counter pass
+            data = self.codes.tobytes()
+            if mask is not None:
+                data = bytes(compress(data, mask))
+            counted = [(code, data.count(bytes([code]))) for code in range(len(self.values))]
+        else:
+            counted = Counter(self.codes if mask is None else compress(self.codes, mask)).items()
+        # Dictionary order is first-appearance order, so ties keep the order rows arrived in
+        return Counter({self.values[code]: n for code, n in sorted(counted) if n})
+
+    def take(self, rows):
+        """New column holding only the given rows"""
+        column = DictColumn()
+        column.values = list(self.values)
+        column.codes_by_value = dict(self.codes_by_value)
+        if np is not None:
+            column.codes = array(self.codes.typecode, self.np_codes()[rows].tobytes())
+        else:
+            column.codes = array(self.codes.typecode, map(self.codes.__getitem__, rows))
+        return column
+
+
+class ListingTable:
+    """Columnar, read-mostly view of many listings for reporting and queries
+
+    Low-cardinality fields (CATEGORICAL_COLUMNS) are dictionary-encoded
+    DictColumns; free text (TEXT_COLUMNS) stays in plain lists. Conditions are
+    given as column=value or column=[values] and combined with AND.
+    """
+
+    def __init__(self):
+        self.columns = {name: DictColumn() for name in CATEGORICAL_COLUMNS}
+        self.columns.update({name: [] for name in TEXT_COLUMNS})
+
+    @classmethod
+    def from_listings(cls, listings):
+        """Build a table from Listing records or dicts"""
+        table = cls()
+        table.extend(listings)
+        return table
+
+    def extend(self, listings):
+        """Add listings as rows"""
+        listings = list(listings)
+        for name, column in self.columns.items():
+            column.extend([listing.get(name, '') for listing in listings])
+
+    def append(self, listing):
+        """Add one listing as a row"""
+        self.extend([listing])
+
+    def __len__(self):
+        return len(self.columns['title'])
+
+    def mask(self, **conditions):
+        """Mask of the rows matching every condition"""
+        if not conditions:
+            return np.ones(len(self), dtype=bool) if np is not None else b'\x01' * len(self)
+        result = None
+        for name, wanted in conditions.items():
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            column = self.columns[name]
+            if isinstance(column, DictColumn):
+                mask = column.mask(wanted)
+            else:
+                wanted = set(wanted)
+                mask = bytes(map(wanted.__contains__, column))
+                if np is not None:
+                    mask = np.frombuffer(mask, dtype=bool)
+            result = mask if result is None else _and(result, mask)
+        return result
+
+    def where(self, **conditions):
+        """Indexes of the rows matching every condition, in row order"""
+        mask = self.mask(**conditions)
+        if np is not None:
+            return np.flatnonzero(mask).tolist()
+        return list(compress(range(len(self)), mask))
+
+    def filter(self, **conditions):
+        """New table holding only the rows matching every condition"""
+        rows = self.where(**conditions)
+        table = ListingTable()
+        for name, column in self.columns.items():
+            if isinstance(column, DictColumn):
+                table.columns[name] = column.take(rows)
+            else:
+                table.columns[name] = list(map(column.__getitem__, rows))
+        return table
+
+    def count_by(self, column, **conditions):
+        """Counter of a categorical column's values over the rows matching the conditions"""
+        return self.columns[column].counts(self.mask(**conditions) if conditions else None)
+
+    def top(self, column, n=10, **conditions):
+        """The n most common values of a categorical column as (value, count) pairs"""
+        return self.count_by(column, **conditions).most_common(n)
+
+    def row(self, index):
+        """One row as a Listing"""
+        return Listing(**{name: column[index] for name, column in self.columns.items()})
+
+    def rows(self, indexes):
+        """Rows as Listings"""
+        return [self.row(index) for index in indexes]
+
+
+def benchmark(count=365_000):
+    """Time filters, group-bys and top-N over a year's worth of synthetic listings"""
+    rng = random.Random(0)
+    categories = ['Technology', 'Healthcare', 'Business', 'Science', 'Arts & Media', 'Education', 'Other']
+    sources = ['Indeed', 'LinkedIn', 'Chegg Internships', 'WayUp', 'Lumiere', 'FindECs', 'InternshipFinder']
+    locations = [f"City {i}" for i in range(300)] + ["Not specified", "Remote"]
+    companies = [f"Company {i}" for i in range(5000)]
+    listings = [{'title': f"Intern #{i}", 'company': rng.choice(companies), 'location': rng.choice(locations),
+                 'description': "See link for details", 'url': f"https://example.com/{i}",
+                 'source': rng.choice(sources), 'category': rng.choice(categories)} for i in range(count)]
+
+    start = time.perf_counter()
+    table = ListingTable.from_listings(listings)
+    built = time.perf_counter() - start
+
+    timings = {}
+    queries = [
+        ('filter category', lambda: table.where(category='Technology')),
+        ('filter category + source', lambda: table.where(category='Technology', source=['Indeed', 'LinkedIn'])),
+        ('count by category', lambda: table.count_by('category')),
+        ('count by source in a category', lambda: table.count_by('source', category='Healthcare')),
+        ('top 10 companies', lambda: table.top('company', 10)),
+        ('top 5 locations in a category', lambda: table.top('location', 5, category='Science')),
+    ]
+    for name, query in queries:
+        start = time.perf_counter()
+        query()
+        timings[name] = time.perf_counter() - start
+
+    print(f"\n=== ListingTable over {count:,} listings ({'NumPy' if np is not None else 'stdlib arrays'}) ===")
+    print(f"Build: {built * 1000:.0f} ms")
+    for name, elapsed in timings.items():
+        print(f"{name}: {elapsed * 1000:.1f} ms")
+    print("=" * 30)
+    return timings
+
+
+if __name__ == "__main__":
+    benchmark()
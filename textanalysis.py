@@ -0,0 +1,56 @@
+import re
+import string
+import unicodedata
+import zlib
+from array import array
+
+_WORD = re.compile(r"[^\W_]+")
+# ASCII punctuation -> space, for the fast path through bytes.translate
+_ASCII_PUNCTUATION = bytes.maketrans(string.punctuation.encode(), b' ' * len(string.punctuation))
+
+# Listing key the per-field analyses are cached under; never written to CSV
+TEXT_KEY = '_text'
+
+
+def tokenize(text):
+    """Lowercased words of a text, splitting on whitespace and punctuation"""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered.encode().translate(_ASCII_PUNCTUATION).decode().split()
+    return _WORD.findall(lowered)
+
+
+def normalize(text):
+    """NFKC-normalized, lowercased text with whitespace collapsed to single spaces"""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    return " ".join(text.lower().split())
+
+
+class TextAnalysis:
+    """One piece of text normalized and tokenized once, for every stage that needs it"""
+
+    __slots__ = ('text', 'normalized', 'tokens', 'hashes')
+
+    def __init__(self, text):
+        self.text = text
+        self.normalized = normalize(text)
+        self.tokens = tokenize(self.normalized)
+        # Stable across processes and runs, unlike hash()
+        self.hashes = array('I', [zlib.crc32(token.encode('utf-8')) for token in self.tokens])
+
+    def has_word_containing(self, fragment):
+        """Whether any word contains a lowercase fragment"""
+        return any(fragment in token for token in self.tokens)
+
+
+def field_text(listing, field):
+    """The cached analysis of one listing field, redone only if the field's value changed"""
+    cache = listing.get(TEXT_KEY)
+    if cache is None:
+        cache = listing[TEXT_KEY] = {}
+    value = listing.get(field) or ''
+    analysis = cache.get(field)
+    if analysis is None or analysis.text != value:
+        analysis = cache[field] = TextAnalysis(value)
+    return analysis
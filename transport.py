@@ -0,0 +1,175 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from retry import DeadlineExceeded, RetryPolicy
+
+
+class HttpTransport:
+    """Keep-alive HTTP transport with one pooled session per host"""
+
+    def __init__(self, headers=None, pool_maxsize=4, pool_block=True, rate_limiter=None, retry_policy=None,
+                 cache=None, adapter_factory=None):
+        self.headers = dict(headers or {})
+        self.headers.setdefault('Connection', 'keep-alive')
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        # Builds each host's adapter in place of a plain HTTPAdapter (see replay.py)
+        self.adapter_factory = adapter_factory or HTTPAdapter
+        self.sessions = {}
+        self.adapters = {}
+        self._lock = threading.Lock()
+
+    def _session_for(self, host):
+        """Get (or create) the pooled session used for a host"""
+        with self._lock:
+            if host not in self.sessions:
+                adapter = self.adapter_factory(pool_connections=1, pool_maxsize=self.pool_maxsize,
+                                               pool_block=self.pool_block)
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self.sessions[host] = session
+                self.adapters[host] = adapter
+            return self.sessions[host]
+
+    def get(self, url, **kwargs):
+        """GET a URL over the host's pooled keep-alive connection, retrying transient failures
+
+        With a cache, the request is made conditional on the cached copy and a
+        304 reply comes back as that copy.
+        """
+        host = urlsplit(url).netloc
+        policy = self.retry_policy
+        kwargs.setdefault('timeout', policy.timeout)
+        if self.cache:
+            kwargs['headers'] = dict(self.cache.conditional_headers(url), **kwargs.get('headers') or {})
+        attempt = 0
+
+        while True:
+            if policy.time_left(host) <= 0:
+                raise DeadlineExceeded(f"Time budget for {host} used up")
+
+            # Time spent waiting for the rate limiter is kept apart from the request itself
+            start = time.monotonic()
+            timing = {'sent': start}
+            try:
+                response = self._get_once(host, url, timing, **kwargs)
+            except requests.RequestException as e:
+                policy.record(host, url, attempt, error=e, elapsed=time.monotonic() - timing['sent'],
+                              waited=timing['sent'] - start)
+                if not policy.should_retry(attempt, error=e):
+                    raise
+            else:
+                policy.record(host, url, attempt, status=response.status_code,
+                              elapsed=time.monotonic() - timing['sent'], waited=timing['sent'] - start)
+                if not policy.should_retry(attempt, status=response.status_code):
+                    return self.cache.update(url, response) if self.cache else response
+
+            delay = policy.backoff(attempt)
+            if delay >= policy.time_left(host):
+                raise DeadlineExceeded(f"Time budget for {host} used up while retrying {url}")
+            time.sleep(delay)
+            attempt += 1
+
+    def _get_once(self, host, url, timing, **kwargs):
+        """Make a single rate-limited request and report its outcome to the limiter
+
+        timing['sent'] is set to when the request went out, after any wait for the limiter.
+        """
+        if not self.rate_limiter:
+            return self._session_for(host).get(url, **kwargs)
+
+        with self.rate_limiter.slot(host):
+            self.rate_limiter.acquire(host)
+            start = timing['sent'] = time.monotonic()
+            try:
+                response = self._session_for(host).get(url, **kwargs)
+            except requests.RequestException:
+                self.rate_limiter.record(host, None, time.monotonic() - start)
+                raise
+            self.rate_limiter.record(host, response.status_code, time.monotonic() - start,
+                                     response.headers.get('Retry-After'))
+            return response
+
+    def warm_up(self, hosts, scheme='https'):
+        """Open a connection to every host up front so the first real page skips the handshake
+
+        Hosts may also be given as origins ("http://host:port") to warm them up over another scheme.
+        """
+        def touch(origin):
+            host = urlsplit(origin).netloc
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(host)
+                self._session_for(host).head(f"{origin}/", allow_redirects=False,
+                                              timeout=self.retry_policy.timeout)
+            except requests.RequestException as e:
+                print(f"Could not warm up connection to {host}: {e}")
+
+        origins = [host if '://' in host else f"{scheme}://{host}" for host in hosts]
+        if not origins:
+            return
+        with ThreadPoolExecutor(max_workers=len(origins)) as executor:
+            list(executor.map(touch, origins))
+
+    def stats(self):
+        """Return per-host counts of connections opened, requests sent and handshakes saved"""
+        stats = {}
+        with self._lock:
+            adapters = list(self.adapters.items())
+
+        for host, adapter in adapters:
+            # Replayed traffic never opens a connection
+            if not isinstance(adapter, HTTPAdapter):
+                continue
+            opened = 0
+            sent = 0
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                sent += pool.num_requests
+            stats[host] = {
+                'connections_opened': opened,
+                'requests': sent,
+                'handshakes_saved': max(sent - opened, 0),
+            }
+        return stats
+
+    def print_stats(self):
+        """Print connection reuse and retry counters for every host"""
+        print("\n=== Connection Reuse ===")
+        for host, counts in sorted(self.stats().items()):
+            print(f"{host}: {counts['requests']} requests, {counts['connections_opened']} connections, "
+                  f"{counts['handshakes_saved']} handshakes saved")
+        print("=" * 30)
+
+        print("\n=== Fetch Attempts ===")
+        for host, outcomes in sorted(self.retry_policy.stats().items()):
+            print(f"{host}: " + ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())))
+        print("=" * 30)
+
+        if self.cache:
+            self.cache.print_stats()
+
+    def close(self):
+        """Close every pooled session, and the cache if there is one"""
+        with self._lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+            self.adapters = {}
+        if self.cache:
+            self.cache.close()
+            self.cache = None
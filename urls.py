@@ -0,0 +1,48 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track how a link was reached, never which listing it is
+TRACKING_PARAMS = {
+    'position', 'pagenum', 'refid', 'trackingid', 'ref', 'src', 'from', 'source',
+    'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'vjs', 'fccid', 'tk',
+}
+
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+
+def canonicalize_url(url, keep_params=None, host=None):
+    """Reduce a listing URL to a stable identity
+
+    Scheme and host are lowercased, default ports and fragments dropped and
+    the remaining query parameters sorted. If `keep_params` is given only
+    those parameters survive, unless the URL carries none of them (an ad
+    link, say); otherwise known tracking parameters (and any utm_*) are
+    removed. `host` replaces the URL's host, for sites that serve the same
+    listing from several domains. Anything that isn't an absolute
+    http(s) URL is returned unchanged.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return url
+
+    netloc = (host or parts.netloc).lower()
+    if netloc.endswith(DEFAULT_PORTS[scheme]):
+        netloc = netloc[:-len(DEFAULT_PORTS[scheme])]
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    # A URL with none of the identifying parameters is identified by its other ones instead
+    if keep_params and not any(key in keep_params for key, _ in params):
+        keep_params = None
+    if keep_params is not None:
+        params = [(key, value) for key, value in params if key in keep_params]
+    else:
+        params = [(key, value) for key, value in params
+                  if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')]
+
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(sorted(params)), ''))
+
+
+def listing_url(listing):
+    """A listing's canonical URL, or None when it has no real link to identify it by"""
+    url = listing.get('url') or ''
+    return url if url.startswith(('http://', 'https://')) else None
@@ -1,18 +1,104 @@
 import requests
-from bs4 import BeautifulSoup
-import csv
-import time
-import random
-import re
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from classify import HITS_KEY, KeywordMatcher
+from crawler import AsyncCrawlEngine
+from httpcache import HttpCache
+from listingstore import ListingStore
+from neardup import NearDuplicateIndex
+from pagearchive import PageArchive
+from parsecache import ParseCache
+from parsing import DEFAULT_BACKEND, ParsePool, compile_specs
+from ratelimit import HostRateLimiter
+from resolve import EntityResolver
+from retry import RetryPolicy
+from seenstore import listing_fingerprints
+from sites import SITE_SPECS
+from snapshot import SnapshotIndex, SnapshotWriter, index_filename
+from table import ListingTable
+from textanalysis import TEXT_KEY, field_text
+from transport import HttpTransport
+from urls import listing_url
+
 class InternshipScraper:
-    def __init__(self):
+    CSV_FIELDS = ['title', 'company', 'location', 'description', 'url', 'source', 'category', 'sources', 'urls']
+
+    def __init__(self, parser_backend=DEFAULT_BACKEND, strain_cards=True, site_specs=None, parse_workers=0,
+                 parse_chunk_size=4, seen_store=None, keep_original_urls=False, near_dup_threshold=0.8,
+                 listing_store=None, http_cache=None, parse_cache=None, page_archive=None, adapter_factory=None,
+                 rate_limiter=None, retry_policy=None):
         self.internships = []
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
+        # Per-host request budget; only a host that has used up its budget waits
+        self.rate_limiter = rate_limiter or HostRateLimiter(rate=0.3, burst=2)
+        
+        # Timeouts, retries with backoff and a time budget per source
+        self.retry_policy = retry_policy or RetryPolicy(connect_timeout=5, read_timeout=20, max_retries=3,
+                                                        source_deadline=300)
+        
+        # Pooled keep-alive sessions shared by every scrape_* method; with an
+        # HttpCache, pages are revalidated and unchanged ones served from disk.
+        # A FixtureRecorder or FixtureReplayer as adapter_factory records the
+        # crawl or replays a recorded one offline
+        self.transport = HttpTransport(headers=self.headers, rate_limiter=self.rate_limiter,
+                                       retry_policy=self.retry_policy, cache=http_cache,
+                                       adapter_factory=adapter_factory)
+        
+        # Site specs compiled once into extraction plans. Pages are parsed with
+        # lxml when installed, and only the card subtrees are built unless
+        # strain_cards is turned off
+        self.parser_backend = parser_backend
+        self.strain_cards = strain_cards
+        self.site_specs = site_specs or SITE_SPECS
+        self.plans = compile_specs(self.site_specs, backend=parser_backend, strain=strain_cards,
+                                   keep_original_url=keep_original_urls)
+        
+        # Listing URLs are stored with tracking parameters stripped; the URL as
+        # scraped is only kept (as an extra CSV column) when asked for
+        self.keep_original_urls = keep_original_urls
+        self.csv_fields = self.CSV_FIELDS + ['original_url'] if keep_original_urls else list(self.CSV_FIELDS)
+        
+        # Optionally parse pages in worker processes so parsing isn't stuck on one core
+        self.parse_pool = None
+        if parse_workers:
+            self.parse_pool = ParsePool(self.site_specs, workers=parse_workers, chunk_size=parse_chunk_size,
+                                        backend=parser_backend, strain=strain_cards,
+                                        keep_original_url=keep_original_urls)
+        
+        # Optional SeenStore of listings processed in earlier runs; when set,
+        # only listings it hasn't seen are categorized and returned
+        self.seen_store = seen_store
+        
+        # Optional ListingStore that save_to_csv also upserts every listing
+        # into, keeping first/last-seen history and a full-text index
+        self.listing_store = listing_store
+        
+        # Optional ParseCache of listings extracted from earlier copies of a
+        # page; unchanged pages skip parsing and categorization
+        self.parse_cache = parse_cache
+        
+        # Optional PageArchive every fetched page is stored in, so listings can
+        # be rebuilt offline with reparse_archive() after a markup change
+        self.page_archive = page_archive
+        
+        # Category index written alongside the last snapshot CSV
+        self.snapshot_index_path = None
+        
+        # Listings whose title and company words are at least this similar
+        # count as the same internship; None turns the near-duplicate pass off
+        self.near_dup_threshold = near_dup_threshold
+        self.near_duplicates = None
+        
+        # Duplicates are merged into one record with the best value for each
+        # field and every source and URL the listing was found under
+        self.resolver = EntityResolver()
+        
         # Define categories with keywords for classification
         self.categories = {
             'Technology': ['tech', 'software', 'developer', 'data', 'IT', 'programming', 'computer', 'cyber', 'web', 'coding', 'AI', 'artificial intelligence', 'machine learning', 'engineering'],
@@ -24,389 +110,363 @@ class InternshipScraper:
             'Government & Law': ['government', 'policy', 'legal', 'law', 'justice', 'political', 'public service', 'nonprofit', 'advocacy'],
             'Engineering': ['engineering', 'mechanical', 'civil', 'electrical', 'aerospace', 'chemical', 'industrial', 'robotics'],
         }
+        
+        # Keyword table compiled once into a single-pass word-boundary matcher;
+        # rebuild it if self.categories is changed
+        self.keyword_matcher = KeywordMatcher(self.categories)
+    
+    def fetch(self, url):
+        """Fetch a page through the shared transport, returning None if it could not be retrieved"""
+        try:
+            return self.transport.get(url)
+        except requests.RequestException as e:
+            print(f"Failed to retrieve {url}: {e}")
+            return None
+    
+    def iter_pages(self, plan, num_pages=None):
+        """Yield (page number, response) for a source in page order
+        
+        Pages are fetched a few at a time, up to the host's adaptive concurrency
+        window; the rate limiter still spaces the requests out. Only that many
+        responses are held in memory at once.
+        """
+        urls = plan.page_urls(num_pages)
+        window = max(min(self.rate_limiter.max_concurrency, len(urls)), 1)
+        executor = ThreadPoolExecutor(max_workers=window)
+        pending = deque()
+        try:
+            for page, url in enumerate(urls, 1):
+                pending.append((page, url, executor.submit(self.fetch, url)))
+                if len(pending) >= window:
+                    page_number, page_url, future = pending.popleft()
+                    yield page_number, self.archive_page(plan, page_url, future.result())
+            while pending:
+                page_number, page_url, future = pending.popleft()
+                yield page_number, self.archive_page(plan, page_url, future.result())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def archive_page(self, plan, url, response):
+        """Store a successfully fetched page in the page archive, if there is one, and pass it on"""
+        if self.page_archive is not None and response is not None and response.status_code == 200:
+            self.page_archive.add(url, response.content, response.encoding, plan.name)
+        return response
+    
+    def cached_page(self, plan, response):
+        """(fingerprint, listings) for a fetched page; listings is None unless the parse cache has the page"""
+        if self.parse_cache is None:
+            return None, None
+        fingerprint = self.parse_cache.fingerprint(plan, response.content, repr(self.categories))
+        return fingerprint, self.parse_cache.get(plan.name, fingerprint)
+    
+    def remember_page(self, plan, fingerprint, listings):
+        """Categorize a freshly parsed page's listings and keep them in the parse cache"""
+        if self.parse_cache is None:
+            return
+        # The hits stay with the listing (and its cached copy) for categorize_internships() to count
+        for listing in listings:
+            listing['category'], listing[HITS_KEY] = self.classify(listing)
+        self.parse_cache.put(plan.name, fingerprint, listings)
+    
+    def scrape_source(self, name, num_pages=None):
+        """Scrape one source site using its compiled site spec"""
+        plan = self.plans[name]
+        print(f"Scraping {name}...")
+        
+        # Listings per page, in page order; pages left for the parse pool are filled in afterwards
+        page_listings = []
+        pages = []
+        for page, response in self.iter_pages(plan, num_pages):
+            if response is not None and response.status_code == 200:
+                fingerprint, listings = self.cached_page(plan, response)
+                if listings is None and self.parse_pool:
+                    pages.append((len(page_listings), fingerprint, (name, response.content, response.encoding)))
+                elif listings is None:
+                    listings = plan.extract(response.text)
+                    self.remember_page(plan, fingerprint, listings)
+                page_listings.append(listings)
+            elif response is not None:
+                print(f"Failed to retrieve {name} page {page}: {response.status_code}")
+        
+        # With a parse pool the raw pages are parsed in worker processes in batches
+        if pages:
+            results = self.parse_pool.extract_many(page for _, _, page in pages)
+            for (slot, fingerprint, _), listings in zip(pages, results):
+                self.remember_page(plan, fingerprint, listings)
+                page_listings[slot] = listings
+        
+        for listings in page_listings:
+            self.internships.extend(listings)
     
     def scrape_indeed(self, num_pages=10):
         """Scrape Indeed for high school internships"""
-        print("Scraping Indeed...")
-        
-        for page in range(num_pages):
-            url = f"https://www.indeed.com/jobs?q=summer+internship+high+school&start={page * 10}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', class_=re.compile('job_'))
-                
-                for job in job_cards:
-                    try:
-                        title_elem = job.find('a', class_=re.compile('jcs-JobTitle'))
-                        company_elem = job.find('span', class_='companyName')
-                        location_elem = job.find('div', class_='companyLocation')
-                        description_elem = job.find('div', class_='job-snippet')
-                        
-                        if title_elem and "intern" in title_elem.text.lower():
-                            title = title_elem.text.strip()
-                            company = company_elem.text.strip() if company_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            description = description_elem.text.strip() if description_elem else "No description available"
-                            
-                            job_url = "https://www.indeed.com" + title_elem['href'] if title_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'description': description,
-                                'url': job_url,
-                                'source': 'Indeed'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing Indeed job: {e}")
-                
-                # Don't overload the server with requests
-                time.sleep(random.uniform(2, 5))
-            else:
-                print(f"Failed to retrieve Indeed page {page+1}: {response.status_code}")
+        self.scrape_source('Indeed', num_pages)
     
     def scrape_linkedin(self, num_pages=10):
         """Scrape LinkedIn for high school internships"""
-        print("Scraping LinkedIn...")
-        
-        for page in range(num_pages):
-            url = f"https://www.linkedin.com/jobs/search/?keywords=summer%20internship%20high%20school&start={page * 25}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', class_='base-card')
-                
-                for job in job_cards:
-                    try:
-                        title_elem = job.find('h3', class_='base-search-card__title')
-                        company_elem = job.find('h4', class_='base-search-card__subtitle')
-                        location_elem = job.find('span', class_='job-search-card__location')
-                        link_elem = job.find('a', class_='base-card__full-link')
-                        
-                        if title_elem and ("intern" in title_elem.text.lower() or "internship" in title_elem.text.lower()):
-                            title = title_elem.text.strip()
-                            company = company_elem.text.strip() if company_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            job_url = link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'description': "See link for details",
-                                'url': job_url,
-                                'source': 'LinkedIn'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing LinkedIn job: {e}")
-                
-                time.sleep(random.uniform(2, 5))
-            else:
-                print(f"Failed to retrieve LinkedIn page {page+1}: {response.status_code}")
+        self.scrape_source('LinkedIn', num_pages)
     
     def scrape_chegg(self, num_pages=5):
         """Scrape Chegg Internships for high school opportunities"""
-        print("Scraping Chegg Internships...")
-        
-        for page in range(1, num_pages + 1):
-            url = f"https://www.internships.com/high-school?page={page}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', class_='internship-row')
-                
-                for job in job_cards:
-                    try:
-                        title_elem = job.find('h2', class_='internship-title')
-                        company_elem = job.find('div', class_='company-name')
-                        location_elem = job.find('span', class_='location')
-                        description_elem = job.find('div', class_='description')
-                        link_elem = job.find('a', class_='title-link')
-                        
-                        if title_elem:
-                            title = title_elem.text.strip()
-                            company = company_elem.text.strip() if company_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            description = description_elem.text.strip() if description_elem else "No description available"
-                            job_url = "https://www.internships.com" + link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'description': description,
-                                'url': job_url,
-                                'source': 'Chegg Internships'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing Chegg job: {e}")
-                
-                time.sleep(random.uniform(2, 5))
-            else:
-                print(f"Failed to retrieve Chegg page {page}: {response.status_code}")
-                
+        self.scrape_source('Chegg Internships', num_pages)
+    
     def scrape_wayup(self, num_pages=5):
         """Scrape WayUp for high school internships"""
-        print("Scraping WayUp...")
-        
-        for page in range(1, num_pages + 1):
-            url = f"https://www.wayup.com/s/internships/high-school/{page}/"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', class_='job-card')
-                
-                for job in job_cards:
-                    try:
-                        title_elem = job.find('h2', class_='job-title')
-                        company_elem = job.find('div', class_='company-name')
-                        location_elem = job.find('div', class_='job-location')
-                        link_elem = job.find('a', class_='job-link')
-                        
-                        if title_elem and ("intern" in title_elem.text.lower() or "internship" in title_elem.text.lower()):
-                            title = title_elem.text.strip()
-                            company = company_elem.text.strip() if company_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            job_url = "https://www.wayup.com" + link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'description': "See link for details",
-                                'url': job_url,
-                                'source': 'WayUp'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing WayUp job: {e}")
-                
-                time.sleep(random.uniform(2, 5))
-            else:
-                print(f"Failed to retrieve WayUp page {page}: {response.status_code}")
+        self.scrape_source('WayUp', num_pages)
     
     def scrape_lumiere(self, num_pages=5):
         """Scrape Lumiere for high school internships"""
-        print("Scraping Lumiere...")
-        
-        for page in range(1, num_pages + 1):
-            url = f"https://www.lumiereducation.com/programs/page/{page}/?category=internships"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                program_cards = soup.find_all('div', class_='program-card')
-                
-                for program in program_cards:
-                    try:
-                        title_elem = program.find('h3', class_='program-title')
-                        details_elem = program.find('div', class_='program-details')
-                        link_elem = program.find('a')
-                        
-                        if title_elem and 'intern' in title_elem.text.lower():
-                            title = title_elem.text.strip()
-                            details = details_elem.text.strip() if details_elem else "See link for details"
-                            job_url = link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': 'Lumiere Education',
-                                'location': 'Various/Remote',
-                                'description': details,
-                                'url': job_url,
-                                'source': 'Lumiere'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing Lumiere program: {e}")
-                
-                time.sleep(random.uniform(2, 4))
-            else:
-                print(f"Failed to retrieve Lumiere page {page}: {response.status_code}")
+        self.scrape_source('Lumiere', num_pages)
     
     def scrape_findecs(self, num_pages=5):
         """Scrape FindECs for high school internships"""
-        print("Scraping FindECs...")
-        
-        for page in range(1, num_pages + 1):
-            url = f"https://www.findecs.org/opportunities/page/{page}/?type=internship"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                opportunity_cards = soup.find_all('div', class_='opportunity-card')
-                
-                for opportunity in opportunity_cards:
-                    try:
-                        title_elem = opportunity.find('h2', class_='opportunity-title')
-                        org_elem = opportunity.find('div', class_='organization')
-                        location_elem = opportunity.find('div', class_='location')
-                        link_elem = opportunity.find('a', class_='opportunity-link')
-                        
-                        if title_elem:
-                            title = title_elem.text.strip()
-                            organization = org_elem.text.strip() if org_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            job_url = link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': organization,
-                                'location': location,
-                                'description': "See link for details",
-                                'url': job_url,
-                                'source': 'FindECs'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing FindECs opportunity: {e}")
-                
-                time.sleep(random.uniform(2, 4))
-            else:
-                print(f"Failed to retrieve FindECs page {page}: {response.status_code}")
+        self.scrape_source('FindECs', num_pages)
     
     def scrape_internship_finder(self, num_pages=5):
         """Scrape InternshipFinder for high school internships"""
-        print("Scraping InternshipFinder...")
-        
-        for page in range(1, num_pages + 1):
-            url = f"https://www.internshipfinder.com/high-school-internships/?page={page}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                internship_listings = soup.find_all('div', class_='listing-card')
-                
-                for listing in internship_listings:
-                    try:
-                        title_elem = listing.find('h3', class_='listing-title')
-                        company_elem = listing.find('div', class_='company-name')
-                        location_elem = listing.find('div', class_='location')
-                        description_elem = listing.find('div', class_='description-preview')
-                        link_elem = listing.find('a', class_='listing-link')
-                        
-                        if title_elem:
-                            title = title_elem.text.strip()
-                            company = company_elem.text.strip() if company_elem else "Not specified"
-                            location = location_elem.text.strip() if location_elem else "Not specified"
-                            description = description_elem.text.strip() if description_elem else "No description available"
-                            job_url = link_elem['href'] if link_elem and link_elem.has_attr('href') else "No link available"
-                            
-                            self.internships.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'description': description,
-                                'url': job_url,
-                                'source': 'InternshipFinder'
-                            })
-                    except Exception as e:
-                        print(f"Error parsing InternshipFinder listing: {e}")
-                
-                time.sleep(random.uniform(2, 4))
-            else:
-                print(f"Failed to retrieve InternshipFinder page {page}: {response.status_code}")
+        self.scrape_source('InternshipFinder', num_pages)
                 
+    def classify(self, internship):
+        """Return (category, keyword hits) for one internship from its cached title and description tokens"""
+        title = field_text(internship, 'title')
+        description = field_text(internship, 'description')
+        return self.keyword_matcher.classify(f"{title.text} {description.text}",
+                                             words=title.tokens + description.tokens)
+    
+    def categorize(self, internship):
+        """Return the category for one internship based on title and description keywords"""
+        category, _ = self.classify(internship)
+        return category
+    
     def categorize_internships(self):
-        """Categorize internships based on title and description keywords"""
+        """Categorize internships based on title and description keywords
+        
+        Listings that already have a category (from the parse cache) keep it,
+        and the keyword hits it was found with are counted instead.
+        Returns the number of keyword hits found for each newly categorized one.
+        """
+        category_hits = Counter()
         for internship in self.internships:
-            internship_text = f"{internship['title']} {internship['description']}".lower()
-            
-            # Default category
-            category = 'Other'
-            
-            # Check for keywords in each category
-            for cat_name, keywords in self.categories.items():
-                if any(keyword.lower() in internship_text for keyword in keywords):
-                    category = cat_name
-                    break
-            
-            # Add category to the internship data
+            hits = internship.pop(HITS_KEY, None)
+            if internship.get('category'):
+                category_hits.update(hits or {})
+                continue
+            category, hits = self.classify(internship)
             internship['category'] = category
+            category_hits.update(hits)
+        return category_hits
+    
+    def dedup_keys(self, internship):
+        """Keys identifying a listing; two listings sharing any of them are the same internship"""
+        keys = [('listing', field_text(internship, 'title').normalized, field_text(internship, 'company').normalized)]
+        url = listing_url(internship)
+        if url:
+            keys.append(('url', url))
+        return keys
                 
+    def new_near_duplicate_index(self):
+        """Fresh near-duplicate index for one run, or None if the pass is turned off"""
+        if not self.near_dup_threshold:
+            return None
+        return NearDuplicateIndex(threshold=self.near_dup_threshold)
+    
     def run_scraper(self, target_count=100):
         """Run all scrapers until we get the target number of internships"""
-        self.scrape_indeed(8)
+        self.retry_policy.reset_deadlines()
+        self.transport.warm_up({plan.origin for plan in self.plans.values()})
         
-        if len(self.internships) < target_count:
-            self.scrape_linkedin(8)
-            
-        if len(self.internships) < target_count:
-            self.scrape_chegg(4)
-            
-        if len(self.internships) < target_count:
-            self.scrape_wayup(4)
-            
-        if len(self.internships) < target_count:
-            self.scrape_lumiere(3)
-            
-        if len(self.internships) < target_count:
-            self.scrape_findecs(3)
-            
-        if len(self.internships) < target_count:
-            self.scrape_internship_finder(3)
-            
-        # Remove duplicates based on title and company
+        for name in self.plans:
+            if len(self.internships) >= target_count:
+                break
+            self.scrape_source(name)
+        
+        return self._finalize(target_count)
+    
+    async def run_scraper_async(self, target_count=100):
+        """Run all scrapers concurrently, one worker per source site"""
+        self.retry_policy.reset_deadlines()
+        await asyncio.to_thread(self.transport.warm_up, {plan.origin for plan in self.plans.values()})
+        
+        engine = AsyncCrawlEngine()
+        jobs = [(plan.host, self.scrape_source, (name,)) for name, plan in self.plans.items()]
+        await engine.run(jobs)
+        
+        # Sources finish in any order, so restore the priority order run_scraper uses
+        source_order = {name: i for i, name in enumerate(self.plans)}
+        self.internships.sort(key=lambda internship: source_order.get(internship['source'], len(source_order)))
+        
+        return self._finalize(target_count)
+    
+    def reparse_archive(self, archive=None, since=None, until=None, sources=None, target_count=None, workers=None,
+                        batch_size=64):
+        """Rebuild listings from archived pages with the current site specs, without any network requests
+        
+        Each distinct archived page of the selected sources (fetched between
+        since and until, Unix times) is extracted again in a parse pool, a
+        batch at a time, then merged, deduplicated and categorized as in a crawl.
+        """
+        archive = archive or self.page_archive
+        pool = self.parse_pool or ParsePool(self.site_specs, workers=workers, backend=self.parser_backend,
+                                            strain=self.strain_cards, keep_original_url=self.keep_original_urls)
+        
+        # Sources in priority order, each source's pages in the order they were first fetched
+        source_order = {name: i for i, name in enumerate(self.plans)}
+        fetches = [row for row in archive.fetches(since=since, until=until, distinct=True)
+                   if row[1] in source_order and (sources is None or row[1] in sources)]
+        fetches.sort(key=lambda row: source_order[row[1]])
+        
+        self.internships = []
+        try:
+            for start in range(0, len(fetches), batch_size):
+                pages = [(source, archive.get(digest), encoding)
+                         for _, source, _, digest, encoding in fetches[start:start + batch_size]]
+                for listings in pool.extract_many(pages):
+                    self.internships.extend(listings)
+        finally:
+            if pool is not self.parse_pool:
+                pool.close()
+        print(f"Re-parsed {len(fetches)} archived pages")
+        
+        return self._finalize(target_count)
+    
+    def crawl_state(self):
+        """Return the adaptive rate/concurrency state each source has settled on"""
+        limiter_stats = self.rate_limiter.stats()
+        return {name: limiter_stats[plan.host] for name, plan in self.plans.items() if plan.host in limiter_stats}
+    
+    def print_crawl_state(self):
+        """Print the request rate and concurrency each source settled on"""
+        print("\n=== Crawl Rate by Source ===")
+        for name, state in self.crawl_state().items():
+            line = f"{name}: {state['rate']:.2f} req/s"
+            if 'concurrency' in state:
+                line += f", concurrency {state['concurrency']} ({state['decreases']} backoffs)"
+            print(line)
+        print("=" * 30)
+    
+    def close(self):
+        """Release pooled connections, parse worker processes and the on-disk stores and caches"""
+        self.transport.close()
+        if self.parse_pool:
+            self.parse_pool.close()
+        if self.seen_store is not None:
+            self.seen_store.close()
+        if self.listing_store is not None:
+            self.listing_store.close()
+        if self.parse_cache is not None:
+            self.parse_cache.close()
+        if self.page_archive is not None:
+            self.page_archive.close()
+    
+    def _finalize(self, target_count):
+        """Merge duplicates, trim and categorize the scraped internships"""
+        # Merge duplicates based on title and company or canonical URL
+        self.resolver = EntityResolver()
         unique_internships = []
-        seen = set()
+        records = {}
         
         for internship in self.internships:
-            key = (internship['title'], internship['company'])
-            if key not in seen:
-                seen.add(key)
-                unique_internships.append(internship)
+            keys = self.dedup_keys(internship)
+            record = next((records[key] for key in keys if key in records), None)
+            if record is None:
+                record = self.resolver.start(internship)
+                unique_internships.append(record)
+            else:
+                self.resolver.merge(record, internship)
+            for key in keys:
+                records.setdefault(key, record)
+        
+        # Merge reworded copies of the same posting into the first one seen
+        self.near_duplicates = self.new_near_duplicate_index()
+        if self.near_duplicates is not None:
+            indexed = []
+            kept = []
+            for internship in unique_internships:
+                _, match = self.near_duplicates.add(internship)
+                indexed.append(internship)
+                if match is None:
+                    kept.append(internship)
+                else:
+                    self.resolver.merge(indexed[match], internship)
+            unique_internships = kept
+        
+        # Skip listings an earlier run already processed, but refresh them so
+        # they don't expire while they are still being posted, and so the
+        # listing store still sees them as live
+        if self.seen_store is not None:
+            new_internships = []
+            for internship in unique_internships:
+                fingerprints = listing_fingerprints(internship)
+                if any(map(self.seen_store.seen, fingerprints)):
+                    for fingerprint in fingerprints:
+                        self.seen_store.add(fingerprint)
+                    if self.listing_store is not None:
+                        self.listing_store.touch(internship)
+                else:
+                    new_internships.append(internship)
+            unique_internships = new_internships
         
         self.internships = unique_internships[:target_count]
+        self.snapshot_index_path = None
+        
+        if self.seen_store is not None:
+            for internship in self.internships:
+                for fingerprint in listing_fingerprints(internship):
+                    self.seen_store.add(fingerprint)
+            self.seen_store.flush()
         
         # Categorize internships
         self.categorize_internships()
         
+        # The text analyses were only needed to get here; kept records don't carry them
+        for internship in self.internships:
+            internship.pop(TEXT_KEY, None)
+        
         return self.internships
     
+    def csv_row(self, internship):
+        """CSV row for a listing, with list fields like sources joined by ' | '"""
+        return {field: ' | '.join(value) if isinstance(value, list) else value
+                for field, value in internship.items() if field not in (TEXT_KEY, HITS_KEY)}
+    
     def save_to_csv(self, filename=None):
-        """Save internships to a CSV file"""
+        """Save internships to a CSV file, and to the listing store if there is one"""
         if not filename:
             current_date = datetime.now().strftime("%Y-%m-%d")
             filename = f"high_school_internships_{current_date}.csv"
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['title', 'company', 'location', 'description', 'url', 'source', 'category']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
+        # The whole run is upserted in one transaction
+        if self.listing_store is not None:
+            self.listing_store.save(self.internships)
+            print(f"Stored {len(self.internships)} internships in {self.listing_store.path}")
+        
+        # One pass writes the snapshot and the byte ranges of every category's rows
+        with SnapshotWriter(filename, self.csv_fields, datetime.now().strftime("%Y-%m-%d")) as writer:
             for internship in self.internships:
-                writer.writerow(internship)
+                writer.write(self.csv_row(internship))
+        self.snapshot_index_path = index_filename(filename)
         
         print(f"Saved {len(self.internships)} internships to {filename}")
     
-    def save_categorized_csv(self):
-        """Save internships to multiple CSV files by category"""
-        current_date = datetime.now().strftime("%Y-%m-%d")
+    def save_categorized_csv(self, materialize=False):
+        """Save internships by category as views over the snapshot CSV
         
-        # Group internships by category
-        categorized = {}
-        for internship in self.internships:
-            category = internship['category']
-            if category not in categorized:
-                categorized[category] = []
-            categorized[category].append(internship)
-        
-        # Save a file for each category
-        for category, internships in categorized.items():
-            filename = f"internships_{category.lower().replace(' & ', '_').replace(' ', '_')}_{current_date}.csv"
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['title', 'company', 'location', 'description', 'url', 'source', 'category']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for internship in internships:
-                    writer.writerow(internship)
-            
-            print(f"Saved {len(internships)} {category} internships to {filename}")
+        Categories are index entries pointing into the snapshot rather than
+        copies of its rows. Category files are only written out when
+        materialize is set; SnapshotIndex (or `python snapshot.py <index>`)
+        can stream or materialize them later.
+        """
+        if self.snapshot_index_path is None:
+            self.save_to_csv()
+        snapshot_index = SnapshotIndex(self.snapshot_index_path)
+        
+        for category in snapshot_index.categories:
+            count = snapshot_index.count(category)
+            if materialize:
+                filename = snapshot_index.materialize(category)
+                print(f"Saved {count} {category} internships to {filename}")
+            else:
+                print(f"Indexed {count} {category} internships in {self.snapshot_index_path}")
         
     def print_internships(self):
         """Print internships to console"""
@@ -420,60 +480,72 @@ class InternshipScraper:
             print(f"URL: {internship['url']}")
             print("-" * 50)
             
-    def print_by_category(self):
+    def listing_table(self):
+        """Columnar ListingTable of the current internships, for counting and filtering"""
+        return ListingTable.from_listings(self.internships)
+    
+    def print_by_category(self, table=None):
         """Print summary of internships by category"""
-        # Group and count internships by category
-        category_counts = {}
-        for internship in self.internships:
-            category = internship['category']
-            if category not in category_counts:
-                category_counts[category] = 0
-            category_counts[category] += 1
+        # Count internships by category on the columnar table
+        if table is None:
+            table = self.listing_table()
         
         # Print summary
         print("\n=== Internships by Category ===")
-        for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
+        for category, count in table.count_by('category').most_common():
             print(f"{category}: {count} internships")
         print("=" * 30)
 
 # Run the scraper
 if __name__ == "__main__":
-    scraper = InternshipScraper()
-    internships = scraper.run_scraper(target_count=100)
+    scraper = InternshipScraper(listing_store=ListingStore('internships.db'), http_cache=HttpCache('http_cache.db'),
+                                parse_cache=ParseCache('parse_cache.db'), page_archive=PageArchive('page_archive'))
+    internships = asyncio.run(scraper.run_scraper_async(target_count=100))
     
     # Save all internships to a single CSV
     scraper.save_to_csv()
     
-    # Save internships by category to separate CSVs
+    # Index internships by category; category files are views over the main CSV
     scraper.save_categorized_csv()
     
     print(f"\nFound {len(internships)} high school summer internship opportunities.")
     
+    # Columnar view shared by the summary and the previews
+    table = scraper.listing_table()
+    
     # Print summary by category
-    scraper.print_by_category()
+    scraper.print_by_category(table)
+    
+    # Confirm keep-alive is actually reusing connections, and how much the cache saved
+    scraper.transport.print_stats()
+    
+    # Show how many unchanged pages skipped parsing, and what was archived
+    scraper.parse_cache.print_stats()
+    scraper.page_archive.print_stats()
+    
+    # Show the rate each source settled on
+    scraper.print_crawl_state()
+    
+    # Show how many duplicates were merged, including reworded ones
+    scraper.resolver.print_report()
+    if scraper.near_duplicates is not None:
+        scraper.near_duplicates.print_report()
     
     # Print a preview from each category
     print("\n=== Preview of Internships by Category ===")
     
-    # Group internships by category
-    by_category = {}
-    for internship in internships:
-        category = internship['category']
-        if category not in by_category:
-            by_category[category] = []
-        by_category[category].append(internship)
-    
     # Print previews for each category
-    for category, category_internships in sorted(by_category.items()):
+    for category in sorted(table.count_by('category')):
+        rows = table.where(category=category)
         print(f"\n--- {category} Internships ---")
-        preview_count = min(3, len(category_internships))
-        for i in range(preview_count):
-            internship = category_internships[i]
+        for i, internship in enumerate(table.rows(rows[:3])):
             print(f"{i+1}. {internship['title']} at {internship['company']} ({internship['location']})")
             print(f"   Source: {internship['source']} | URL: {internship['url']}")
         
         # Show how many more are available in this category
-        if len(category_internships) > 3:
-            print(f"   ... and {len(category_internships) - 3} more {category} internships")
+        if len(rows) > 3:
+            print(f"   ... and {len(rows) - 3} more {category} internships")
+    
+    print("\nAll internships have been saved to CSV, with a category index for per-category views.")
     
-    print("\nAll internships have been saved to CSV files by category.")
\ No newline at end of file
+    scraper.close()
\ No newline at end of file